@@ -1,7 +1,10 @@
 # keep_alive.py
 from threading import Thread
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 import uvicorn
+from src.components.utils.metrics import registry
+from src.components.utils.helpResolver import get_help_resolver_stats
 
 app = FastAPI()
 
@@ -9,6 +12,16 @@ app = FastAPI()
 def read_root():
     return {"status": "bot is running"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/stats/help")
+def help_stats():
+    # Rolling-window help-search latency percentiles, overall and per guild
+    return get_help_resolver_stats()
+
 def run():
     uvicorn.run(app, host="0.0.0.0", port=10000)
 
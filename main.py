@@ -1,50 +1,80 @@
 import asyncio
+import logging
 import aiohttp
 import discord
 import os
 from dotenv import load_dotenv
-from src.components.agents.GroqAgent import agent
-from src.components.utils.intentClassifier import classify_intent
+from src.components.utils.logConfig import setup_logging
+
+setup_logging()  # before the component imports, so their import-time logs are captured
+
+from src.components.agents.modelRouter import model_router
+from src.components.utils.intentClassifier import (
+    classify_intent_detailed, classify_intent_by_rules, warm_up_classifiers, set_local_intent_model
+)
+from src.components.utils.intentModel import load_local_intent_model
 from src.components.prompts.serverInfoPrompt import generate_server_prompt
 from src.components.prompts.userInfoPrompt import generate_user_prompt
 from src.components.utils.messageUtils import extract_clean_user_message
-from src.components.utils.eventReminder import handle_event_or_reminder
+from src.components.utils.eventReminder import handle_event_or_reminder, is_reminder_candidate, reminder_scheduler
+from src.components.utils.messagePipeline import MessagePipeline
+from src.components.utils.metrics import time_stage
 from src.components.utils.helpResolver import handle_help_request_optimized as handle_help_request
+from src.components.utils.channelProfiles import channel_profiles
+from src.components.utils.messageIndex import message_index
+from src.components.utils.channelPermissions import channel_permissions
+from src.components.utils.guildState import get_guild_version, bump_guild_version
+from src.components.utils.responseCache import server_info_cache
+from src.components.utils.streamingReply import STREAM_REPLIES, stream_agent_reply
+from src.components.utils.serverInfo import get_guild_snapshot
+from src.components.utils.presenceTracker import PRIVILEGED_INTENTS, presence_tracker
+from src.components.utils.roleIndex import invalidate_role_index
 from fast_api import keep_alive
 
 # Updated import for improved personality manager
 from src.components.utils.personalityManager import (
     set_personality, 
     get_personality, 
-    format_with_personality,
     get_available_personalities,
     get_personality_help_text
 )
 
 load_dotenv()
 
+logger = logging.getLogger('DiscordBot')
+
 keep_alive()  # Start the dummy web server
 
+# Local intent model trained from logged decisions (python -m src.components.utils.intentModel train)
+set_local_intent_model(load_local_intent_model())
+
 
 # Your Discord bot logic below
 DISCORD_BOT_TOKEN = os.getenv('DISCORD_TOKEN')
 CHANNEL_ID = int(os.getenv('CHANNEL_ID'))
-print(f"Channel ID: {CHANNEL_ID}")
+logger.info("Channel ID: %s", CHANNEL_ID)
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.messages = True
 intents.guilds = True
+# Privileged intents (PRIVILEGED_INTENTS=true once enabled in the developer portal): member and presence
+# events keep the O(1) member counters current; without them only guild.member_count is known
+intents.members = PRIVILEGED_INTENTS
+intents.presences = PRIVILEGED_INTENTS
 
 client = discord.Client(intents=intents)
 
 # Updated to use the improved personality system
 VALID_PERSONALITIES = get_available_personalities()  # Now gets from the improved system
 
-TRUSTED_BOT_IDS = [
+# Opt-in: generate the general-conversation reply in parallel with intent classification
+SPECULATIVE_GENERATION = os.getenv("SPECULATIVE_GENERATION", "false").lower() == "true"
+
+TRUSTED_BOT_IDS = {
     1336350743837409341,  
     1372896968233189516   
-]
+}
 
 async def self_pinger():
     while True:
@@ -52,95 +82,283 @@ async def self_pinger():
             async with aiohttp.ClientSession() as session:
                 await session.get("https://ralsai.onrender.com")
         except Exception as e:
-            print(f"[Self-ping error]: {e}")
+            logger.warning("[Self-ping error]: %s", e)
         await asyncio.sleep(600)  # every 10 minutes
 
+async def generate_reply(guild: discord.Guild, personality: str, prompt: str):
+    # Personality and static server info live in the pooled agent's system prompt
+    return await model_router.generate(guild, personality, prompt)
+
 @client.event
 async def on_ready():
     client.loop.create_task(self_pinger())
-    print(f'✅ Logged in as {client.user} (ID: {client.user.id})')
+    warm_up_classifiers()
+    reminder_scheduler.start(client)
+    for guild in client.guilds:
+        channel_profiles.ensure_guild(guild)
+        get_guild_snapshot(guild)
+        client.loop.create_task(message_index.backfill_guild(guild))
+    logger.info("✅ Logged in as %s (ID: %s)", client.user, client.user.id)
 
 
 @client.event
-async def on_message(message: discord.Message):
-    if message.author.bot and message.author.id not in TRUSTED_BOT_IDS:
-        print(f"⛔ Skipping message from untrusted bot: {message.author.name} (ID: {message.author.id})")
-        return
-    
-    if await handle_event_or_reminder(message):
-        return
+async def on_guild_remove(guild):
+    # Release the counters of guilds the bot has left
+    presence_tracker.drop_guild(guild.id)
+
+
+@client.event
+async def on_guild_update(before, after):
+    bump_guild_version(after.id)
+    get_guild_snapshot(after).refresh_basic(after)
+
+
+@client.event
+async def on_guild_channel_create(channel):
+    bump_guild_version(channel.guild.id)
+    channel_permissions.invalidate(channel.guild.id)
+    channel_profiles.refresh_channel(channel)
+    get_guild_snapshot(channel.guild).on_channel_create(channel)
+
+
+@client.event
+async def on_guild_channel_update(before, after):
+    bump_guild_version(after.guild.id)
+    channel_permissions.invalidate(after.guild.id)
+    channel_profiles.refresh_channel(after)
+    if isinstance(after, discord.TextChannel):
+        get_guild_snapshot(after.guild).refresh_notable_channels(after.guild)
+
+
+@client.event
+async def on_guild_channel_delete(channel):
+    bump_guild_version(channel.guild.id)
+    channel_permissions.invalidate(channel.guild.id)
+    channel_profiles.remove_channel(channel)
+    message_index.purge_channel(channel.id)
+    get_guild_snapshot(channel.guild).on_channel_delete(channel)
+
+
+@client.event
+async def on_guild_role_create(role):
+    bump_guild_version(role.guild.id)
+    channel_permissions.invalidate(role.guild.id)
+    invalidate_role_index(role.guild.id)
+    get_guild_snapshot(role.guild).refresh_roles(role.guild)
+
+
+@client.event
+async def on_guild_role_update(before, after):
+    bump_guild_version(after.guild.id)
+    channel_permissions.invalidate(after.guild.id)
+    invalidate_role_index(after.guild.id)
+    get_guild_snapshot(after.guild).refresh_roles(after.guild)
+
+
+@client.event
+async def on_guild_role_delete(role):
+    bump_guild_version(role.guild.id)
+    channel_permissions.invalidate(role.guild.id)
+    invalidate_role_index(role.guild.id)
+    get_guild_snapshot(role.guild).refresh_roles(role.guild)
+
+
+@client.event
+async def on_member_join(member):
+    presence_tracker.on_member_join(member)
+    get_guild_snapshot(member.guild).refresh_members(member.guild)
+
+
+@client.event
+async def on_member_remove(member):
+    presence_tracker.on_member_remove(member)
+    get_guild_snapshot(member.guild).refresh_members(member.guild)
+
+
+@client.event
+async def on_presence_update(before, after):
+    presence_tracker.on_presence_update(before, after)
+    get_guild_snapshot(after.guild).refresh_members(after.guild)
+
+
+@client.event
+async def on_member_update(before, after):
+    # The bot's own role changes alter what it can read
+    if after.id == client.user.id:
+        channel_permissions.invalidate(after.guild.id)
+
+
+# Raw events: the cached variants never fire for backfilled or older messages
+@client.event
+async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
+    message_index.update_from_payload(payload.message_id, payload.data)
+
+
+@client.event
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    message_index.delete_messages([payload.message_id])
+
+
+@client.event
+async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent):
+    message_index.delete_messages(payload.message_ids)
+
+
+async def index_message(message: discord.Message) -> bool:
+    message_index.add_message(message)
+    return False
+
+
+async def skip_untrusted_bot(message: discord.Message) -> bool:
+    logger.debug("⛔ Skipping message from untrusted bot: %s (ID: %s)", message.author.name, message.author.id)
+    return True
 
-    if client.user in message.mentions:
-        user_mention = message.author.mention
-        # Use improved extraction
+
+def is_untrusted_bot(message: discord.Message) -> bool:
+    return message.author.bot and message.author.id not in TRUSTED_BOT_IDS
+
+
+def mentions_bot(message: discord.Message) -> bool:
+    return client.user in message.mentions
+
+
+async def handle_mention(message: discord.Message) -> bool:
+    user_mention = message.author.mention
+    # Use improved extraction
+    with time_stage("message_cleaning"):
         user_message = extract_clean_user_message(message, client.user.id, client.user.name)
-        
-        # Debug: See what extraction produces (remove in production)
-        print(f"Original: {message.content}")
-        print(f"Cleaned: {user_message}")
-
-        # 🧠 Enhanced personality management with improved validation
-        if "set personality to" in user_message.lower():
-            parts = user_message.lower().split("set personality to")
-            if len(parts) > 1:
-                new_persona = parts[1].strip()
-                
-                # Use improved personality system with better validation
-                if set_personality(message.guild.id, new_persona):
-                    await message.channel.send(f"{user_mention} Personality switched to **{new_persona}** 🧠")
-                else:
-                    # Send helpful error message with all available personalities
-                    available_personalities = ", ".join(VALID_PERSONALITIES.keys())
-                    await message.channel.send(
-                        f"{user_mention} Invalid personality. Choose one of: {available_personalities}"
-                    )
-                return
-        
-        # 🧠 Show personality help
-        if "personality help" in user_message.lower() or "list personalities" in user_message.lower():
-            help_text = get_personality_help_text()
-            await message.channel.send(f"{user_mention}\n{help_text}")
-            return
+    
+    logger.debug("Original: %s", message.content)
+    logger.debug("Cleaned: %s", user_message)
 
-        try:
-            # 🧠 Intent classification using improved classifier
-            intent = await classify_intent(user_message)
-            print(f"🔍 Detected intent: {intent}")
-
-            # 🧠 Handle different intents with improved prompts
-            if intent == "user_wants_help":     # Intent: Help detection
-                await handle_help_request(message)
-                return
-
-            elif intent == "server_info":   # Intent: Server info
-                input_prompt = generate_server_prompt(user_message, message.guild)
-                
-            elif intent == "user_info":  # Intent: User info (using improved user prompt)
-                input_prompt = generate_user_prompt(user_message, message)
-                
-            else:   # Intent: General conversation
-                input_prompt = f"User message: {user_message}"
-
-            # 🧠 Enhanced personality formatting with context
-            personality = get_personality(message.guild.id)
-            # Pass Discord moderator context to the improved personality system
-            final_prompt = format_with_personality(
-                input_prompt, 
-                personality, 
-                context="You are a Discord AI moderator for the server 'The Rals'"
+    # 🧠 Enhanced personality management with improved validation
+    if "set personality to" in user_message.lower():
+        parts = user_message.lower().split("set personality to")
+        if len(parts) > 1:
+            new_persona = parts[1].strip()
+            
+            # Use improved personality system with better validation
+            if set_personality(message.guild.id, new_persona):
+                await message.channel.send(f"{user_mention} Personality switched to **{new_persona}** 🧠")
+            else:
+                # Send helpful error message with all available personalities
+                available_personalities = ", ".join(VALID_PERSONALITIES.keys())
+                await message.channel.send(
+                    f"{user_mention} Invalid personality. Choose one of: {available_personalities}"
+                )
+            return True
+    
+    # 🧠 Show personality help
+    if "personality help" in user_message.lower() or "list personalities" in user_message.lower():
+        help_text = get_personality_help_text()
+        await message.channel.send(f"{user_mention}\n{help_text}")
+        return True
+
+    personality = get_personality(message.guild.id)
+    mention_count = sum(1 for user in message.mentions if user.id != client.user.id)
+    speculative_task = None
+
+    try:
+        # ⚡ Speculative mode: start the general reply while an LLM classification is in flight
+        if SPECULATIVE_GENERATION and classify_intent_by_rules(user_message, mention_count) is None:
+            speculative_task = asyncio.create_task(
+                generate_reply(message.guild, personality, f"User message: {user_message}")
             )
+
+        # 🧠 Intent classification using improved classifier
+        with time_stage("intent_classification"):
+            decision = await classify_intent_detailed(user_message, mention_count, guild_id=message.guild.id)
+        intent = decision["intent"]
+        logger.info(
+            "🔍 Detected intent: %s (tier: %s, confidence: %.2f)", intent, decision['tier'], decision['confidence'],
+            extra={'guild_id': message.guild.id, 'intent': intent, 'intent_tier': decision['tier']}
+        )
+
+        if speculative_task and intent != "general":
+            speculative_task.cancel()
+            speculative_task = None
+
+        # 🧠 Handle different intents with improved prompts
+        if intent == "user_wants_help":     # Intent: Help detection
+            await handle_help_request(message)
+            return True
+
+        elif intent == "server_info":   # Intent: Server info
+            # Read once, before the prompt is built: the reply is cached under the state it was built from
+            guild_version = get_guild_version(message.guild.id)
+            cached_reply = server_info_cache.get(message.guild.id, personality, guild_version, user_message)
+            if cached_reply:
+                logger.debug("💾 Served server_info reply from cache")
+                await message.channel.send(f"{user_mention} {cached_reply}")
+                return True
+            with time_stage("prompt_building"):
+                input_prompt = generate_server_prompt(user_message, message.guild, include_static_context=False)
             
-            print(f"🎭 Applied personality: {personality}")
-            print(f"📝 Final prompt: {final_prompt[:200]}...")  # Truncated for cleaner logs
+        elif intent == "user_info":  # Intent: User info (using improved user prompt)
+            with time_stage("prompt_building"):
+                input_prompt = generate_user_prompt(user_message, message)
+            
+        else:   # Intent: General conversation
+            input_prompt = f"User message: {user_message}"
+
+        if speculative_task:
+            # 💬 Speculation paid off: the general reply is already being generated
+            logger.debug("⚡ Using speculative response (personality: %s)", personality)
+            agent_response = await speculative_task
+            speculative_task = None
+        else:
+            final_prompt = input_prompt
+            
+            logger.debug("🎭 Applied personality: %s", personality)
+            logger.debug("📝 Final prompt: %.200s...", final_prompt)  # Truncated for cleaner logs
+
+            if STREAM_REPLIES:
+                # 💬 Stream the response into Discord as it is generated
+                assistant_message = await model_router.run_exclusive(
+                    message.guild, personality,
+                    lambda guild_agent: stream_agent_reply(
+                        guild_agent, final_prompt, message.channel, prefix=f"{user_mention} "
+                    )
+                )
+                # Empty when the stream produced nothing (the fallback text was shown instead)
+                if assistant_message and intent == "server_info":
+                    server_info_cache.put(message.guild.id, personality, guild_version, user_message, assistant_message)
+                return True
 
             # 💬 Generate response
-            agent_response = await agent.arun(message=final_prompt)
-            assistant_message = getattr(agent_response, "content", None) or "🤖 I couldn't generate a response."
+            agent_response = await generate_reply(message.guild, personality, final_prompt)
+
+        assistant_message = getattr(agent_response, "content", None)
+        if assistant_message and intent == "server_info":
+            server_info_cache.put(message.guild.id, personality, guild_version, user_message, assistant_message)
+        assistant_message = assistant_message or "🤖 I couldn't generate a response."
 
+        with time_stage("discord_send"):
             await message.channel.send(f"{user_mention} {assistant_message}")
 
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            await message.channel.send(f"{user_mention} Sorry, I encountered an error while trying to respond.")
+    except Exception as e:
+        logger.exception("❌ Error: %s", e)
+        await message.channel.send(f"{user_mention} Sorry, I encountered an error while trying to respond.")
+
+    finally:
+        if speculative_task:
+            speculative_task.cancel()
+
+    return True
+
+
+# on_message dispatch: cheap gates first, so the reminder regex and the LLM path
+# only see messages that can match them
+message_pipeline = MessagePipeline()
+message_pipeline.add_stage("index", index_message)
+message_pipeline.add_stage("untrusted_bot", skip_untrusted_bot, gate=is_untrusted_bot)
+message_pipeline.add_stage("reminder", handle_event_or_reminder, gate=is_reminder_candidate)
+message_pipeline.add_stage("mention", handle_mention, gate=mentions_bot)
+
+
+@client.event
+async def on_message(message: discord.Message):
+    await message_pipeline.dispatch(message)
 
-client.run(DISCORD_BOT_TOKEN)
\ No newline at end of file
+# Logging is configured by setup_logging(); don't let discord.py install its own root handler
+client.run(DISCORD_BOT_TOKEN, log_handler=None)
\ No newline at end of file
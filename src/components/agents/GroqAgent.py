@@ -1,12 +1,20 @@
 from agno.agent import Agent
 from dotenv import load_dotenv
 import os
+from typing import List
+from discord import Guild
 from agno.models.groq import Groq
+from src.components.agents.modelProviders import create_model, tier_model
+from src.components.utils.personalityManager import get_personality_instructions
+from src.components.utils.serverInfo import RALS_OVERVIEW
+from src.components.agents.agentPool import AgentPool
 
 load_dotenv()
 
 discord_token = os.getenv('DISCORD_TOKEN')
 groq_api_key = os.getenv('GROQ_API_KEY')
+# agno debug output prints every prompt and response synchronously; keep it off in production
+AGENT_DEBUG = os.getenv('AGENT_DEBUG', 'false').lower() == 'true'
 
 enhanced_instructions = """
     
@@ -45,5 +53,45 @@ agent = Agent(model = Groq(id= "llama-3.3-70b-versatile", api_key=groq_api_key,
         show_tool_calls=True,
         instructions=enhanced_instructions,
         markdown=False,
-        debug_mode=True,
-        )
\ No newline at end of file
+        debug_mode=AGENT_DEBUG,
+        )
+
+MODERATOR_CONTEXT = "You are a Discord AI moderator for the server 'The Rals'"
+DEFAULT_MODEL_ID = tier_model("generation")
+
+
+def build_system_instructions(guild: Guild, personality: str) -> List[str]:
+    """
+    Static, per-(guild, personality) system prompt: base behaviour, personality
+    guidance and the hand-written server overview. Identical across messages,
+    so provider-side prompt caching can reuse it.
+    """
+    return [
+        enhanced_instructions,
+        get_personality_instructions(personality, MODERATOR_CONTEXT),
+        f"SERVER OVERVIEW ({guild.name}):\n{RALS_OVERVIEW}",
+    ]
+
+
+def build_guild_agent(guild: Guild, personality: str, model_id: str = DEFAULT_MODEL_ID) -> Agent:
+    """
+    Builds an agent for a guild, personality and model, with its system prompt built once.
+    `model_id` is a backend spec ('provider:model_id'); a bare model id is a Groq model.
+    """
+    return Agent(model = create_model(model_id),
+            tools=[],
+            show_tool_calls=True,
+            instructions=build_system_instructions(guild, personality),
+            markdown=False,
+            debug_mode=AGENT_DEBUG,
+            )
+
+
+# Per-(guild, personality, model) agents, leased one conversation at a time
+agent_pool = AgentPool(build_guild_agent)
+
+
+
+def lease_guild_agent(guild: Guild, personality: str, model_id: str = DEFAULT_MODEL_ID):
+    """Async context manager yielding a pooled agent for one conversation turn"""
+    return agent_pool.lease(guild, personality, model_id)
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Callable, List, Tuple
+import logging
+import os
+from agno.agent import Agent
+from discord import Guild
+
+logger = logging.getLogger('AgentPool')
+
+AGENT_POOL_MAX_SIZE = int(os.getenv("AGENT_POOL_MAX_SIZE", "32"))
+
+PoolKey = Tuple[int, str, str]  # (guild_id, personality, model_id)
+
+
+class AgentPool:
+    """
+    Bounded LRU pool of agents keyed by (guild, personality, model).
+
+    An agent is leased to one conversation at a time, so concurrent messages never
+    share run state or memory; extra agents for a busy key are built on demand.
+    Memory is cleared when an agent is returned, so each lease starts with no history.
+    Idle agents stay warm (system prompt built, client open) until the pool is over
+    max_size, when the least recently used keys are evicted first.
+
+    Args:
+        factory: Builds an agent for (guild, personality, model_id)
+        max_size: Maximum number of idle agents kept across all keys
+    """
+
+    def __init__(self, factory: Callable[[Guild, str, str], Agent], max_size: int = AGENT_POOL_MAX_SIZE):
+        self.factory = factory
+        self.max_size = max_size
+        self._idle: "OrderedDict[PoolKey, List[Agent]]" = OrderedDict()
+        self.stats = {'built': 0, 'reused': 0, 'evicted': 0, 'discarded': 0}
+
+    @asynccontextmanager
+    async def lease(self, guild: Guild, personality: str, model_id: str):
+        """Borrow an agent for one conversation turn"""
+        key = (guild.id, personality, model_id)
+        idle = self._idle.get(key)
+        if idle:
+            pooled_agent = idle.pop()
+            self.stats['reused'] += 1
+        else:
+            pooled_agent = self.factory(guild, personality, model_id)
+            self.stats['built'] += 1
+            logger.debug("Built agent for %s", key)
+
+        try:
+            yield pooled_agent
+        except BaseException:
+            # A failed or cancelled run may leave partial state behind; don't reuse the agent
+            self.stats['discarded'] += 1
+            raise
+        else:
+            self._reset(pooled_agent)
+            self._idle.setdefault(key, []).append(pooled_agent)
+            self._idle.move_to_end(key)
+            self._evict()
+
+    @staticmethod
+    def _reset(pooled_agent: Agent) -> None:
+        """Drops the finished run from the agent's memory so reuse never grows it"""
+        memory = getattr(pooled_agent, "memory", None)
+        if memory is not None and hasattr(memory, "clear"):
+            memory.clear()
+        pooled_agent.run_response = None
+
+    def _evict(self) -> None:
+        while self.size() > self.max_size:
+            key, agents = next(iter(self._idle.items()))
+            agents.pop(0)
+            if not agents:
+                del self._idle[key]
+            self.stats['evicted'] += 1
+            logger.debug("Evicted idle agent for %s", key)
+
+    def size(self) -> int:
+        return sum(len(agents) for agents in self._idle.values())
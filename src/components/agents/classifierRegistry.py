@@ -0,0 +1,79 @@
+from agno.agent import Agent
+from dotenv import load_dotenv
+from typing import Any, Dict, List, Optional, Union
+import logging
+import os
+from src.components.agents.modelProviders import create_model, tier_model
+
+load_dotenv()
+
+logger = logging.getLogger('ClassifierRegistry')
+
+DEFAULT_CLASSIFIER_TIER = "classification"
+
+# One model per backend spec: classifiers built on the same model share its API client and HTTP connection pool
+_models: Dict[str, Any] = {}
+# Instructions registered per classifier name, used for lazy construction and warm-up
+_specs: Dict[str, tuple] = {}
+
+
+def get_shared_model(model_id: str) -> Any:
+    """Returns the process-wide temperature-0 model for a backend spec ('provider:model_id')"""
+    if model_id not in _models:
+        _models[model_id] = create_model(model_id)
+    return _models[model_id]
+
+
+def classifier_model(name: str, tier: str = DEFAULT_CLASSIFIER_TIER) -> str:
+    """
+    Backend spec for a classifier: CLASSIFIER_MODEL_<NAME> (e.g. CLASSIFIER_MODEL_CHANNEL_RANKER)
+    overrides the model of the classifier's tier.
+    """
+    return os.getenv(f"CLASSIFIER_MODEL_{name.upper()}") or tier_model(tier)
+
+
+def register_classifier(name: str, instructions: Union[str, List[str]], tier: str = DEFAULT_CLASSIFIER_TIER,
+                        model_id: Optional[str] = None) -> None:
+    """Registers a classifier so it can be built lazily or during warm-up"""
+    _specs[name] = (instructions, model_id or classifier_model(name, tier))
+
+
+def build_classifier(name: str, model_id: Optional[str] = None) -> Agent:
+    """Builds a new agent for a registered classifier, optionally on another model (used for evaluation)"""
+    instructions, default_model_id = _specs[name]
+    return Agent(
+        model=get_shared_model(model_id or default_model_id),
+        tools=[],
+        instructions=instructions,
+        show_tool_calls=False,
+        markdown=False,
+    )
+
+
+def classifier_backend(name: str) -> str:
+    """Backend spec a registered classifier runs on (selects its scheduler rate limit)"""
+    return _specs[name][1]
+
+
+def get_classifier(name: str) -> Agent:
+    """
+    Returns a fresh classifier agent for one call. Only the model (API client and
+    connection pool) is shared: agno agents keep every run in their memory and hold
+    per-run state, so a shared agent would grow without bound and mix up concurrent runs.
+    """
+    return build_classifier(name)
+
+
+def warm_up_classifiers() -> None:
+    """Builds every registered classifier's shared model and client ahead of the first message"""
+    for _, model_id in _specs.values():
+        get_shared_model(model_id)
+
+    for model in _models.values():
+        try:
+            if hasattr(model, "get_async_client"):
+                model.get_async_client()
+        except Exception as e:
+            logger.warning("Could not pre-build client for %s: %s", model.id, e)
+
+    logger.info("Warmed up %s classifiers on %s shared models", len(_specs), len(_models))
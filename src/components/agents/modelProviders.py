@@ -0,0 +1,62 @@
+from dotenv import load_dotenv
+from typing import Tuple
+import os
+
+load_dotenv()
+
+DEFAULT_PROVIDER = "groq"
+
+# provider -> environment variable holding its API key
+PROVIDER_API_KEYS = {
+    "groq": "GROQ_API_KEY",
+    "mistral": "MISTRAL_API_KEY",
+    "openai": "OPENAI_API_KEY",
+}
+
+# Model tier per kind of task: single-word classification runs on a small, low-latency
+# model while reply generation keeps the large one
+MODEL_TIERS = {
+    "classification": os.getenv("CLASSIFICATION_MODEL", "groq:llama-3.1-8b-instant"),
+    "generation": os.getenv("GENERATION_MODEL", "groq:llama-3.3-70b-versatile"),
+}
+
+
+def tier_model(tier: str) -> str:
+    """Returns the backend spec configured for a model tier"""
+    return MODEL_TIERS[tier]
+
+
+def parse_backend(backend: str) -> Tuple[str, str]:
+    """Splits a 'provider:model_id' backend spec; a bare model id is a Groq model"""
+    provider, sep, model_id = backend.partition(":")
+    if not sep:
+        return DEFAULT_PROVIDER, backend
+    return provider.strip().lower(), model_id.strip()
+
+
+def provider_available(provider: str) -> bool:
+    """True if the provider is known and its API key is configured"""
+    key_name = PROVIDER_API_KEYS.get(provider)
+    return bool(key_name and os.getenv(key_name))
+
+
+def create_model(backend: str, temperature: float = 0):
+    """
+    Builds the agno model for a backend spec such as 'groq:llama-3.3-70b-versatile',
+    'mistral:mistral-small-latest' or 'openai:gpt-4.1-mini'.
+
+    Provider SDKs are imported lazily, so only the providers in use need to be installed.
+    """
+    provider, model_id = parse_backend(backend)
+    if provider not in PROVIDER_API_KEYS:
+        raise ValueError(f"Unknown model provider '{provider}'")
+    api_key = os.getenv(PROVIDER_API_KEYS[provider])
+
+    if provider == "groq":
+        from agno.models.groq import Groq
+        return Groq(id=model_id, api_key=api_key, temperature=temperature)
+    if provider == "mistral":
+        from agno.models.mistral import MistralChat
+        return MistralChat(id=model_id, api_key=api_key, temperature=temperature)
+    from agno.models.openai import OpenAIChat
+    return OpenAIChat(id=model_id, api_key=api_key, temperature=temperature)
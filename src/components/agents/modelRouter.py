@@ -0,0 +1,269 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from agno.agent import Agent
+from discord import Guild
+from src.components.agents.GroqAgent import DEFAULT_MODEL_ID, lease_guild_agent
+from src.components.agents.modelProviders import parse_backend, provider_available
+from src.components.utils.llmScheduler import llm_scheduler, PRIORITY_INTERACTIVE
+from src.components.utils.metrics import LLM_LATENCY
+
+logger = logging.getLogger('ModelRouter')
+
+# Candidate generation backends ('provider:model_id'), in order of preference when there is no latency data yet
+LLM_BACKENDS = os.getenv(
+    "LLM_BACKENDS",
+    f"{DEFAULT_MODEL_ID},mistral:mistral-small-latest,openai:gpt-4.1-mini"
+)
+LLM_HEDGING = os.getenv("LLM_HEDGING", "true").lower() == "true"
+# Fixed hedge delay in seconds; unset = the primary backend's rolling p95
+LLM_HEDGE_DELAY = os.getenv("LLM_HEDGE_DELAY")
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))
+LLM_HEDGE_DEFAULT_DELAY = 4.0  # used until the primary has latency samples
+LLM_STATS_WINDOW = int(os.getenv("LLM_STATS_WINDOW", "100"))
+LLM_MAX_ERROR_RATE = float(os.getenv("LLM_MAX_ERROR_RATE", "0.5"))
+LLM_MAX_CONSECUTIVE_FAILURES = int(os.getenv("LLM_MAX_CONSECUTIVE_FAILURES", "3"))
+LLM_DEGRADED_COOLDOWN = float(os.getenv("LLM_DEGRADED_COOLDOWN", "30"))
+MIN_SAMPLES_FOR_HEALTH = 4
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class BackendStats:
+    """Rolling latency and error window for one provider/model backend"""
+
+    def __init__(self, window: int = LLM_STATS_WINDOW):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.degraded_until = 0.0
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= LLM_MAX_CONSECUTIVE_FAILURES or (
+            len(self.outcomes) >= MIN_SAMPLES_FOR_HEALTH and self.error_rate >= LLM_MAX_ERROR_RATE
+        ):
+            self.degraded_until = time.monotonic() + LLM_DEGRADED_COOLDOWN
+
+    @property
+    def p50(self) -> Optional[float]:
+        return _percentile(list(self.latencies), 0.5)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return _percentile(list(self.latencies), 0.95)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def healthy(self) -> bool:
+        # After the cooldown the backend is tried again; one more failure re-degrades it
+        return time.monotonic() >= self.degraded_until
+
+
+class ModelRouter:
+    """
+    Routes generation requests across providers.
+
+    Each request goes to the fastest healthy backend (lowest rolling p50). If it has
+    not answered within the hedge delay of starting (time queued in the scheduler does
+    not count), the same request is sent to the next backend
+    and the first answer wins; a failed backend fails over to the next one. Backends
+    with a high error rate or repeated failures are skipped for a cooldown period.
+
+    Args:
+        backends: Backend specs ('provider:model_id'); ones without an API key are ignored
+        hedging: Whether to hedge slow requests with a second backend
+        hedge_delay: Fixed hedge delay in seconds, or None to use the primary's p95
+    """
+
+    def __init__(self, backends: List[str], hedging: bool = LLM_HEDGING, hedge_delay: Optional[float] = None):
+        self.backends = [b for b in backends if provider_available(parse_backend(b)[0])] or backends[:1]
+        self.hedging = hedging
+        self.hedge_delay = hedge_delay
+        self.backend_stats: Dict[str, BackendStats] = {b: BackendStats() for b in self.backends}
+        self.stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'failovers': 0}
+        logger.info("🧭 Model router backends: %s", ', '.join(self.backends))
+
+    def ranked_backends(self) -> List[str]:
+        """Healthy backends fastest first (unmeasured ones in configured order), then degraded ones"""
+        def sort_key(item):
+            index, backend = item
+            stats = self.backend_stats[backend]
+            p50 = stats.p50
+            return (not stats.healthy(), p50 if p50 is not None else float("inf"), index)
+
+        return [backend for _, backend in sorted(enumerate(self.backends), key=sort_key)]
+
+    def _hedge_delay_for(self, backend: str) -> float:
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        p95 = self.backend_stats[backend].p95
+        return max(LLM_HEDGE_MIN_DELAY, p95 if p95 is not None else LLM_HEDGE_DEFAULT_DELAY)
+
+    async def _call(self, backend: str, guild: Guild, personality: str,
+                    run: Callable[[Agent], Awaitable[Any]], priority: int,
+                    on_start: Optional[Callable[[], None]] = None) -> Any:
+        stats = self.backend_stats[backend]
+        provider, model_id = parse_backend(backend)
+        async with lease_guild_agent(guild, personality, backend) as guild_agent:
+            async def timed_run():
+                # Timed inside the scheduler so queueing does not count as provider latency
+                if on_start is not None:
+                    on_start()
+                start = time.perf_counter()
+                try:
+                    result = await run(guild_agent)
+                except asyncio.CancelledError:
+                    LLM_LATENCY.observe(time.perf_counter() - start, provider=provider, model=model_id, outcome="cancelled")
+                    raise
+                except Exception:
+                    LLM_LATENCY.observe(time.perf_counter() - start, provider=provider, model=model_id, outcome="error")
+                    raise
+                latency = time.perf_counter() - start
+                stats.record_success(latency)
+                LLM_LATENCY.observe(latency, provider=provider, model=model_id, outcome="ok")
+                return result
+
+            try:
+                return await llm_scheduler.submit(timed_run, priority=priority, guild_id=guild.id, backend=backend)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                stats.record_failure()
+                raise
+
+    async def generate(self, guild: Guild, personality: str, prompt: str, priority: int = PRIORITY_INTERACTIVE):
+        """Runs the prompt on the best backend with hedging and failover; returns the agent response"""
+        self.stats['requests'] += 1
+        candidates = self.ranked_backends()
+        pending: Dict[asyncio.Task, str] = {}
+        next_index = 0
+        hedged = False
+        last_error: Optional[BaseException] = None
+        # When each backend's call left the scheduler queue and actually started
+        run_started: Dict[str, float] = {}
+        started = asyncio.Event()
+
+        def launch() -> None:
+            nonlocal next_index
+            backend = candidates[next_index]
+            next_index += 1
+
+            def on_start() -> None:
+                run_started[backend] = time.monotonic()
+                started.set()
+
+            task = asyncio.create_task(self._call(
+                backend, guild, personality, lambda a: a.arun(message=prompt, stream=False), priority, on_start
+            ))
+            pending[task] = backend
+
+        launch()
+        try:
+            while pending:
+                can_hedge = self.hedging and not hedged and len(pending) == 1 and next_index < len(candidates)
+                primary = next(iter(pending.values()))
+                timeout = None
+                if can_hedge and primary not in run_started:
+                    # Still queued in the scheduler: a hedge would only add load to the congested queue.
+                    # Wait for the call to start (or finish) before starting the hedge clock.
+                    started.clear()
+                    waiter = asyncio.create_task(started.wait())
+                    try:
+                        done, _ = await asyncio.wait({*pending, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        waiter.cancel()
+                    done.discard(waiter)
+                    if not done:
+                        continue
+                else:
+                    if can_hedge:
+                        elapsed = time.monotonic() - run_started[primary]
+                        timeout = max(0.0, self._hedge_delay_for(primary) - elapsed)
+                    done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    timeout = self._hedge_delay_for(primary)
+                    hedged = True
+                    self.stats['hedged'] += 1
+                    logger.info("🪁 %s is slow (> %.1fs), hedging with %s", primary, timeout, candidates[next_index])
+                    launch()
+                    continue
+
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is None:
+                        if hedged and backend != candidates[0]:
+                            self.stats['hedge_wins'] += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning("⚠️ LLM backend %s failed: %s", backend, last_error)
+
+                if not pending and next_index < len(candidates):
+                    self.stats['failovers'] += 1
+                    logger.info("🔀 Failing over to %s", candidates[next_index])
+                    launch()
+
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def run_exclusive(self, guild: Guild, personality: str, run: Callable[[Agent], Awaitable[Any]],
+                            priority: int = PRIORITY_INTERACTIVE) -> Any:
+        """
+        Runs a side-effecting call (e.g. streaming into Discord) on one backend at a time:
+        no hedging, but fails over to the next backend if it raises.
+        """
+        self.stats['requests'] += 1
+        last_error: Optional[BaseException] = None
+        for attempt, backend in enumerate(self.ranked_backends()):
+            if attempt:
+                self.stats['failovers'] += 1
+                logger.info("🔀 Failing over to %s", backend)
+            try:
+                return await self._call(backend, guild, personality, run, priority)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                last_error = e
+                logger.warning("⚠️ LLM backend %s failed: %s", backend, e)
+        raise last_error
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-backend rolling p50/p95 latency, error rate and health"""
+        return {
+            backend: {
+                'p50': stats.p50,
+                'p95': stats.p95,
+                'error_rate': stats.error_rate,
+                'samples': len(stats.outcomes),
+                'healthy': stats.healthy(),
+            }
+            for backend, stats in self.backend_stats.items()
+        }
+
+
+# Shared, process-wide router for generation requests
+model_router = ModelRouter(
+    [backend.strip() for backend in LLM_BACKENDS.split(",") if backend.strip()],
+    hedge_delay=float(LLM_HEDGE_DELAY) if LLM_HEDGE_DELAY else None,
+)
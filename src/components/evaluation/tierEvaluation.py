@@ -0,0 +1,161 @@
+"""
+Offline accuracy/latency evaluation of intent classification tiers.
+
+Replays labeled messages (JSONL lines of {"message": ..., "intent": ...}, optionally with
+"mention_count"; otherwise @name tokens are counted as user mentions) through each tier
+and reports accuracy, coverage and latency percentiles:
+
+    python -m src.components.evaluation.tierEvaluation
+    python -m src.components.evaluation.tierEvaluation --tiers rules,groq:llama-3.1-8b-instant,groq:llama-3.3-70b-versatile
+
+Tiers are `rules`, `local` (the registered local model), `pipeline` (the full tiered
+classify_intent_detailed) or any 'provider:model_id' backend spec.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+from src.components.agents.classifierRegistry import build_classifier
+from src.components.agents.modelProviders import tier_model
+from src.components.utils.intentClassifier import (
+    classify_intent_by_rules, classify_intent_detailed, get_local_intent_model, parse_intent_label,
+    set_local_intent_model
+)
+from src.components.utils.intentModel import load_local_intent_model
+from src.components.utils.llmScheduler import llm_scheduler, PRIORITY_BACKGROUND
+
+DEFAULT_SAMPLES_PATH = os.path.join(os.path.dirname(__file__), "intentSamples.jsonl")
+# Stand-in for Discord user mentions in plain-text samples
+MENTION_PATTERN = re.compile(r"(?<!\w)@\w+")
+
+
+def load_samples(path: str = DEFAULT_SAMPLES_PATH) -> List[Dict[str, Any]]:
+    """Loads labeled {"message", "intent", "mention_count"} samples from a JSONL file"""
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                sample = json.loads(line)
+                mention_count = sample.get("mention_count", len(MENTION_PATTERN.findall(sample["message"])))
+                samples.append({"message": sample["message"], "intent": sample["intent"], "mention_count": mention_count})
+    return samples
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _predict(tier: str, message: str, mention_count: int = 0) -> Optional[str]:
+    """Returns the tier's intent for a message, or None if the tier abstains"""
+    if tier == "rules":
+        decision = classify_intent_by_rules(message, mention_count)
+        return decision["intent"] if decision else None
+    if tier == "local":
+        intent, _ = get_local_intent_model()(message)
+        return intent
+    if tier == "pipeline":
+        # Not logged: evaluation samples must not end up in the local model's training data
+        return (await classify_intent_detailed(message, mention_count, log=False))["intent"]
+
+    # A fresh agent per sample, like production: agno agents accumulate run history
+    result = await build_classifier("intent", tier).arun(message=f"Classify this message: '{message}'")
+    return parse_intent_label(getattr(result, "content", None)) or "general"
+
+
+async def evaluate_tier(tier: str, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Runs every sample through one tier and returns its accuracy and latency summary"""
+    is_backend = tier not in ("rules", "local", "pipeline")
+    if tier == "local" and get_local_intent_model() is None:
+        return {"tier": tier, "skipped": "no local intent model registered"}
+
+    latencies: List[float] = []
+    answered = correct = errors = 0
+    confusion: Dict[str, Dict[str, int]] = {}
+
+    for sample in samples:
+        async def timed_predict():
+            # Timed inside the scheduler so rate-limit queueing does not count as latency
+            start = time.perf_counter()
+            intent = await _predict(tier, sample["message"], sample["mention_count"])
+            latencies.append(time.perf_counter() - start)
+            return intent
+
+        try:
+            if not is_backend:
+                # rules/local are CPU-only; the pipeline schedules its own LLM calls
+                predicted = await timed_predict()
+            else:
+                predicted = await llm_scheduler.submit(timed_predict, priority=PRIORITY_BACKGROUND, backend=tier)
+        except Exception as e:
+            errors += 1
+            print(f"❌ {tier} failed on '{sample['message'][:40]}': {e}")
+            continue
+
+        if predicted is None:
+            continue
+        answered += 1
+        correct += predicted == sample["intent"]
+        row = confusion.setdefault(sample["intent"], {})
+        row[predicted] = row.get(predicted, 0) + 1
+
+    return {
+        "tier": tier,
+        "samples": len(samples),
+        "coverage": answered / len(samples) if samples else 0.0,
+        "accuracy": correct / answered if answered else 0.0,
+        "errors": errors,
+        "latency_p50_ms": (_percentile(latencies, 0.5) or 0.0) * 1000,
+        "latency_p95_ms": (_percentile(latencies, 0.95) or 0.0) * 1000,
+        "confusion": confusion,
+    }
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print(f"{'tier':<42} {'coverage':>8} {'accuracy':>8} {'p50 ms':>9} {'p95 ms':>9} {'errors':>6}")
+    for result in results:
+        if "skipped" in result:
+            print(f"{result['tier']:<42} skipped: {result['skipped']}")
+            continue
+        print(
+            f"{result['tier']:<42} {result['coverage']:>8.1%} {result['accuracy']:>8.1%} "
+            f"{result['latency_p50_ms']:>9.2f} {result['latency_p95_ms']:>9.2f} {result['errors']:>6}"
+        )
+
+
+async def run_evaluation(tiers: List[str], samples_path: str = DEFAULT_SAMPLES_PATH,
+                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    samples = load_samples(samples_path)[:limit]
+    return [await evaluate_tier(tier, samples) for tier in tiers]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluate intent classification tiers on labeled messages")
+    parser.add_argument("--data", default=DEFAULT_SAMPLES_PATH, help="JSONL file of {message, intent} samples")
+    parser.add_argument(
+        "--tiers",
+        default=f"rules,local,{tier_model('classification')},{tier_model('generation')}",
+        help="Comma-separated tiers: rules, local, pipeline or provider:model_id backends"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N samples")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    tiers = [tier.strip() for tier in args.tiers.split(",") if tier.strip()]
+    set_local_intent_model(load_local_intent_model())
+    results = asyncio.run(run_evaluation(tiers, args.data, args.limit))
+    print_report(results)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
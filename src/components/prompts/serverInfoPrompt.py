@@ -3,8 +3,14 @@ import logging
 from typing import Dict, Any
 from src.components.utils.serverInfo import generate_context_from_guild
 import discord
+from src.components.utils.promptBudget import PromptSection, assemble_prompt
 
-def generate_server_prompt(message: str, guild: discord.Guild) -> str:
+logger = logging.getLogger('ServerInfoPrompt')
+
+# Cap on the server context section of a server information prompt
+SERVER_CONTEXT_TOKEN_BUDGET = 1500
+
+def generate_server_prompt(message: str, guild: discord.Guild, include_static_context: bool = True) -> str:
     """
     Generates an enhanced prompt for server information queries with comprehensive
     context and clear instructions for AI responses.
@@ -12,6 +18,8 @@ def generate_server_prompt(message: str, guild: discord.Guild) -> str:
     Args:
         message: User's original query about the server
         guild: Discord guild object containing server information
+        include_static_context: Include the static server overview; pass False when
+            the agent's system prompt already carries it
         
     Returns:
         Enhanced prompt string with server context and response instructions
@@ -21,7 +29,7 @@ def generate_server_prompt(message: str, guild: discord.Guild) -> str:
     query_analysis = _analyze_server_query(message)
     
     # Generate comprehensive server context
-    server_context = generate_context_from_guild(guild)
+    server_context = generate_context_from_guild(guild, include_static=include_static_context)
     
     # Log debug information
     _log_server_query_debug(message, guild.name, query_analysis)
@@ -86,10 +94,7 @@ def _log_server_query_debug(message: str, guild_name: str, analysis: Dict[str, A
     """
     Logs server query analysis for debugging and monitoring.
     """
-    logging.info(f"SERVER QUERY DEBUG:\n"
-                f"Guild: {guild_name}\n"
-                f"Query: '{message}'\n"
-                f"Analysis: {analysis}")
+    logger.debug("SERVER QUERY DEBUG:\nGuild: %s\nQuery: '%s'\nAnalysis: %s", guild_name, message, analysis)
 
 def _create_enhanced_server_prompt(message: str, server_context: str, 
                                  query_analysis: Dict[str, Any], guild: discord.Guild) -> str:
@@ -100,38 +105,40 @@ def _create_enhanced_server_prompt(message: str, server_context: str,
     # Generate response instructions based on query analysis
     response_instructions = _generate_response_instructions(query_analysis)
     
-    return f"""
-        SERVER INFORMATION REQUEST:
-        User Query: "{message}"
-        Server: {guild.name}
+    sections = [
+        PromptSection("query", f"""SERVER INFORMATION REQUEST:
+User Query: "{message}"
+Server: {guild.name}""", priority=0, required=True),
 
-        QUERY ANALYSIS:
-        Primary Focus: {query_analysis['primary_focus'].replace('_', ' ').title()}
-        Detected Topics: {', '.join(query_analysis['detected_topics']) if query_analysis['detected_topics'] else 'General'}
-        Question Type: {query_analysis['question_type'] or 'Statement/General'}
+        PromptSection("query_analysis", f"""QUERY ANALYSIS:
+Primary Focus: {query_analysis['primary_focus'].replace('_', ' ').title()}
+Detected Topics: {', '.join(query_analysis['detected_topics']) if query_analysis['detected_topics'] else 'General'}
+Question Type: {query_analysis['question_type'] or 'Statement/General'}""", priority=4),
 
-        AVAILABLE SERVER DATA:
-        {server_context}
+        PromptSection("server_data", f"""AVAILABLE SERVER DATA:
+{server_context}""", priority=2, max_tokens=SERVER_CONTEXT_TOKEN_BUDGET),
 
-        RESPONSE INSTRUCTIONS:
-        {response_instructions}
+        PromptSection("response_instructions", f"""RESPONSE INSTRUCTIONS:
+{response_instructions}""", priority=1),
 
-        GENERAL GUIDELINES:
-        1. Use a casual, friendly tone that matches Discord culture
-        2. Be informative but not overwhelming
-        3. If asked about something not in the server data, acknowledge what you don't know
-        4. Use natural language and avoid overly formal responses
-        5. Include relevant emojis if they enhance the message (but don't overuse)
-        6. Keep responses concise unless detailed information is specifically requested
+        PromptSection("guidelines", """GENERAL GUIDELINES:
+1. Use a casual, friendly tone that matches Discord culture
+2. Be informative but not overwhelming
+3. If asked about something not in the server data, acknowledge what you don't know
+4. Use natural language and avoid overly formal responses
+5. Include relevant emojis if they enhance the message (but don't overuse)
+6. Keep responses concise unless detailed information is specifically requested""", priority=3),
 
-        RESPONSE STRUCTURE:
-        - Start with a direct answer to their question
-        - Include 2-3 most relevant pieces of information
-        - End with a helpful note or invitation for more questions if appropriate
-        - Aim for 1-3 sentences for simple queries, more for complex ones
+        PromptSection("response_structure", """RESPONSE STRUCTURE:
+- Start with a direct answer to their question
+- Include 2-3 most relevant pieces of information
+- End with a helpful note or invitation for more questions if appropriate
+- Aim for 1-3 sentences for simple queries, more for complex ones
 
-        Generate your response now:
-        """
+Generate your response now:""", priority=5),
+    ]
+    
+    return assemble_prompt(sections)
 
 def _generate_response_instructions(query_analysis: Dict[str, Any]) -> str:
     """
@@ -2,6 +2,10 @@ import discord
 from datetime import datetime, timezone
 from typing import List, Dict
 import logging
+from src.components.utils.roleIndex import get_role_index
+from src.components.utils.promptBudget import PromptSection, assemble_prompt
+
+logger = logging.getLogger('UserInfoPrompt')
 
 def generate_user_prompt(user_message: str, message: discord.Message) -> str:
     """
@@ -67,7 +71,7 @@ def _gather_user_information(user: discord.Member, guild: discord.Guild) -> Dict
         user_info.update(_get_server_specific_info(user, guild))
         
         # Role information
-        user_info.update(_get_role_information(user))
+        user_info.update(_get_role_information(user, guild))
         
         # Activity and status
         user_info.update(_get_activity_status(user))
@@ -78,7 +82,7 @@ def _gather_user_information(user: discord.Member, guild: discord.Guild) -> Dict
         return user_info
         
     except Exception as e:
-        logging.error(f"Error gathering user information: {e}")
+        logger.error("Error gathering user information: %s", e)
         return {"Error": "Could not retrieve user information"}
 
 def _get_server_specific_info(user: discord.Member, guild: discord.Guild) -> Dict[str, str]:
@@ -110,18 +114,18 @@ def _get_server_specific_info(user: discord.Member, guild: discord.Guild) -> Dic
     
     return info
 
-def _get_role_information(user: discord.Member) -> Dict[str, str]:
+def _get_role_information(user: discord.Member, guild: discord.Guild) -> Dict[str, str]:
     """
-    Collects detailed role information.
+    Collects detailed role information using the guild's cached role index.
     """
-    # Filter out @everyone and organize roles
-    meaningful_roles = [role for role in user.roles if role.name != "@everyone"]
+    index = get_role_index(guild)
+    
+    # Filter out @everyone and sort roles by position (highest first)
+    meaningful_roles = index.sort_roles(user.roles)
     
     if not meaningful_roles:
         return {"Roles": "No special roles (only @everyone)"}
     
-    # Sort roles by position (highest first)
-    meaningful_roles.sort(key=lambda r: r.position, reverse=True)
     role_names = [role.name for role in meaningful_roles]
     
     # Get highest role info
@@ -130,6 +134,7 @@ def _get_role_information(user: discord.Member) -> Dict[str, str]:
     return {
         "Roles": ", ".join(role_names),
         "Highest Role": f"{highest_role.name} (Position: {highest_role.position})",
+        "Role Type": index.role_type(highest_role).title(),
         "Role Count": str(len(meaningful_roles))
     }
 
@@ -200,10 +205,10 @@ def _log_user_query_debug(user_message: str, user_info: Dict[str, str]) -> None:
     """
     Logs debug information for troubleshooting.
     """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     debug_output = "\n".join([f"  {k}: {v}" for k, v in user_info.items()])
-    logging.info(f"USER QUERY DEBUG:\n"
-                f"Query: '{user_message}'\n"
-                f"User Information:\n{debug_output}")
+    logger.debug("USER QUERY DEBUG:\nQuery: '%s'\nUser Information:\n%s", user_message, debug_output)
 
 def _generate_no_user_prompt(user_message: str) -> str:
     """
@@ -231,31 +236,33 @@ def _create_enhanced_user_prompt(user_message: str, user_info: Dict[str, str], t
     # Format user information clearly
     formatted_info = "\n".join([f"  • {k}: {v}" for k, v in user_info.items()])
     
-    return f"""
-USER INFORMATION REQUEST:
+    sections = [
+        PromptSection("query", f"""USER INFORMATION REQUEST:
 Query: "{user_message}"
-Target User: @{target_user.display_name}
+Target User: @{target_user.display_name}""", priority=0, required=True),
 
-AVAILABLE USER DATA:
-{formatted_info}
+        PromptSection("user_data", f"""AVAILABLE USER DATA:
+{formatted_info}""", priority=1, required=True),
 
-RESPONSE INSTRUCTIONS:
+        PromptSection("response_instructions", """RESPONSE INSTRUCTIONS:
 1. Generate a friendly, informative response about this user
 2. Use the provided information to answer the user's specific question
 3. Keep the tone casual and engaging
 4. Include relevant details but don't overwhelm with information
 5. If the query asks for specific info not available, mention what you don't have access to
-6. Be respectful of the mentioned user's privacy
+6. Be respectful of the mentioned user's privacy""", priority=2),
 
-RESPONSE GUIDELINES:
+        PromptSection("response_guidelines", """RESPONSE GUIDELINES:
 - Start with a direct answer to their question
 - Use natural, conversational language
 - Include 2-3 most relevant pieces of information
 - End on a positive, friendly note
 - Keep response length appropriate (1-3 sentences typically)
 
-Generate your response now:
-"""
+Generate your response now:""", priority=3),
+    ]
+    
+    return assemble_prompt(sections)
 
 # Utility function for testing and validation
 def validate_user_prompt_generation(message: discord.Message) -> bool:
@@ -0,0 +1,51 @@
+import logging
+from typing import Dict, List, Set
+import discord
+
+logger = logging.getLogger('ChannelPermissions')
+
+
+class ChannelPermissionMap:
+    """
+    Per-guild map of the text channels the bot can read history in.
+
+    Built lazily from channel.permissions_for(guild.me) and invalidated on role,
+    channel and bot-member updates, so unreadable channels are dropped before any
+    classification or fetch work is spent on them.
+    """
+
+    def __init__(self):
+        self._readable: Dict[int, Set[int]] = {}  # guild_id -> readable text channel ids
+
+    def _build(self, guild: discord.Guild) -> Set[int]:
+        readable = set()
+        for channel in guild.text_channels:
+            permissions = channel.permissions_for(guild.me)
+            if permissions.read_messages and permissions.read_message_history:
+                readable.add(channel.id)
+
+        self._readable[guild.id] = readable
+        logger.info("🔐 Permission map for '%s': %s/%s channels readable", guild.name, len(readable), len(guild.text_channels))
+        return readable
+
+    def readable_channel_ids(self, guild: discord.Guild) -> Set[int]:
+        readable = self._readable.get(guild.id)
+        if readable is None:
+            readable = self._build(guild)
+        return readable
+
+    def can_read_history(self, channel: discord.TextChannel) -> bool:
+        return channel.id in self.readable_channel_ids(channel.guild)
+
+    def filter_readable(self, guild: discord.Guild, channels: List[discord.TextChannel]) -> List[discord.TextChannel]:
+        """Keep only the channels the bot can read history in, preserving order"""
+        readable = self.readable_channel_ids(guild)
+        return [channel for channel in channels if channel.id in readable]
+
+    def invalidate(self, guild_id: int) -> None:
+        if self._readable.pop(guild_id, None) is not None:
+            logger.debug("🔐 Invalidated permission map for guild %s", guild_id)
+
+
+# Shared, process-wide permission map
+channel_permissions = ChannelPermissionMap()
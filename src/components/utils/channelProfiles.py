@@ -0,0 +1,169 @@
+import asyncio
+import atexit
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Set, Tuple
+import discord
+from src.components.utils.textFeatures import STOP_WORDS, cosine_similarity, embed_text, extract_keywords, tokenize
+
+logger = logging.getLogger('ChannelProfiles')
+
+PROFILE_STORE_PATH = os.getenv("CHANNEL_PROFILE_PATH", os.path.join("data", "channel_profiles.json"))
+# Profile changes are written out in one batch this many seconds after the first one
+PROFILE_SAVE_DELAY = float(os.getenv("CHANNEL_PROFILE_SAVE_DELAY", "5"))
+
+# Channels with these words in their name are good general fallbacks for help questions
+HELP_CHANNEL_KEYWORDS = ['help', 'support', 'question', 'ask', 'faq', 'info', 'announcements', 'schedule', 'event', 'tournament']
+
+
+class ChannelProfileStore:
+    """
+    Persistent, query-independent profiles of every text channel, per guild.
+
+    Profiles are built once (no LLM calls), refreshed on channel events and
+    matched against help queries locally. Changes are saved in debounced batches.
+    """
+
+    def __init__(self, path: str = PROFILE_STORE_PATH):
+        self.path = path
+        self.profiles: Dict[int, Dict[int, dict]] = {}  # guild_id -> channel_id -> profile
+        self._save_pending = False
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self) -> None:
+        """Load persisted profiles from disk, if any"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self.profiles = {
+                int(guild_id): {int(channel_id): profile for channel_id, profile in channels.items()}
+                for guild_id, channels in raw.items()
+            }
+            logger.info("💾 Loaded channel profiles for %s guilds from %s", len(self.profiles), self.path)
+        except Exception as e:
+            logger.error("❌ Error loading channel profiles from %s: %s", self.path, e)
+            self.profiles = {}
+
+    def schedule_save(self) -> None:
+        """Marks the store dirty; it is saved PROFILE_SAVE_DELAY seconds later (immediately outside a loop)"""
+        if self._save_pending:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        self._save_pending = True
+        loop.call_later(PROFILE_SAVE_DELAY, self.flush)
+
+    def flush(self) -> None:
+        """Saves pending changes, if any"""
+        if self._save_pending:
+            self.save()
+
+    def save(self) -> None:
+        """Persist all profiles to disk (atomically, via a temp file)"""
+        self._save_pending = False
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.profiles, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error("❌ Error saving channel profiles to %s: %s", self.path, e)
+
+    def _build_profile(self, channel: discord.TextChannel) -> dict:
+        """Build the profile of a single text channel"""
+        category_name = channel.category.name if channel.category else ""
+        topic = channel.topic or ""
+        description = f"#{channel.name}" + (f" in {category_name}" if category_name else "") + (f": {topic}" if topic else "")
+        permissions = channel.permissions_for(channel.guild.me)
+
+        return {
+            "channel_id": channel.id,
+            "name": channel.name,
+            "category": category_name,
+            "topic": topic,
+            "description": description,
+            "keywords": sorted(extract_keywords(f"{channel.name} {category_name} {topic}")),
+            "embedding": embed_text(f"{channel.name} {channel.name} {category_name} {topic}"),
+            "can_read": permissions.read_messages,
+            "can_read_history": permissions.read_message_history,
+        }
+
+    def build_guild(self, guild: discord.Guild) -> None:
+        """(Re)build the profiles of every text channel in a guild"""
+        self.profiles[guild.id] = {channel.id: self._build_profile(channel) for channel in guild.text_channels}
+        logger.info("🗂️ Built %s channel profiles for '%s'", len(self.profiles[guild.id]), guild.name)
+        self.schedule_save()
+
+    def ensure_guild(self, guild: discord.Guild) -> None:
+        """Build a guild's profiles only if missing or out of sync with its channel list"""
+        known = self.profiles.get(guild.id)
+        if known is None or set(known) != {channel.id for channel in guild.text_channels}:
+            self.build_guild(guild)
+
+    def refresh_channel(self, channel: discord.abc.GuildChannel) -> None:
+        """Refresh one channel's profile after a create/update event"""
+        if not isinstance(channel, discord.TextChannel):
+            return
+        self.profiles.setdefault(channel.guild.id, {})[channel.id] = self._build_profile(channel)
+        logger.debug("🔄 Refreshed profile for #%s", channel.name)
+        self.schedule_save()
+
+    def remove_channel(self, channel: discord.abc.GuildChannel) -> None:
+        """Drop a deleted channel's profile"""
+        if self.profiles.get(channel.guild.id, {}).pop(channel.id, None) is not None:
+            logger.debug("🗑️ Removed profile for #%s", channel.name)
+            self.schedule_save()
+
+    def match(self, guild: discord.Guild, query: str, limit: int = 7, min_score: float = 0.15,
+              readable_ids: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Scores every readable channel profile of a guild against a query.
+
+        Args:
+            readable_ids: Current readable channel ids; when given, used instead of
+                the readability flags stored in the profiles
+
+        Returns:
+            (channel_id, score) pairs, best first, at most `limit` entries
+        """
+        self.ensure_guild(guild)
+        query_keywords = extract_keywords(query)
+        query_embedding = embed_text(query)
+
+        scored = []
+        for channel_id, profile in self.profiles.get(guild.id, {}).items():
+            if readable_ids is not None:
+                if channel_id not in readable_ids:
+                    continue
+            elif not (profile["can_read"] and profile["can_read_history"]):
+                continue
+
+            score = cosine_similarity(query_embedding, profile["embedding"])
+            if query_keywords:
+                overlap = query_keywords.intersection(profile["keywords"])
+                score += 0.5 * len(overlap) / len(query_keywords)
+            if any(keyword in profile["name"].lower() for keyword in HELP_CHANNEL_KEYWORDS):
+                score += 0.1
+
+            if score >= min_score:
+                scored.append((channel_id, score))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def get_profile(self, guild_id: int, channel_id: int) -> Optional[dict]:
+        return self.profiles.get(guild_id, {}).get(channel_id)
+
+
+# Shared, process-wide profile store
+channel_profiles = ChannelProfileStore()
@@ -1,15 +1,170 @@
 import asyncio
+import heapq
+import logging
+import os
 import re
-from datetime import datetime, timedelta
-from discord import Message, TextChannel, User
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+import discord
+from discord import Message
 
-# In-memory store (could be replaced with DB later)
-scheduled_reminders = []
+logger = logging.getLogger('EventReminder')
 
+REMINDER_DB_PATH = os.getenv("REMINDER_DB_PATH", os.path.join("data", "reminders.db"))
+# Failed deliveries (e.g. transient HTTP errors) are retried with exponential backoff
+REMINDER_MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", "6"))
+REMINDER_RETRY_BASE = float(os.getenv("REMINDER_RETRY_BASE", "30"))
+REMINDER_RETRY_MAX = 3600.0
+
+# Substring every reminder request contains; checked before the regex
+REMINDER_TRIGGER = "remind me"
 REMINDER_REGEX = re.compile(r"remind me to (.+?) in (\d+) (second|seconds|minute|minutes|hour|hours|day|days)", re.IGNORECASE)
 
+
+class ReminderScheduler:
+    """
+    Durable reminder scheduler.
+
+    Reminders are stored in SQLite (indexed by due time) and survive restarts. A
+    single timer loop sleeps until the earliest due reminder, using an in-memory
+    min-heap of (due_at, reminder_id). A reminder is deleted from the store only once
+    it was delivered (or its channel is gone); failed deliveries are rescheduled with
+    exponential backoff, up to REMINDER_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, path: str = REMINDER_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS reminders (
+                reminder_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                task TEXT NOT NULL,
+                due_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders (due_at);
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(reminders)")}
+        if "attempts" not in columns:
+            self.conn.execute("ALTER TABLE reminders ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        self.conn.commit()
+
+        self.client: Optional[discord.Client] = None
+        self._heap: List[Tuple[float, int]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def start(self, client: discord.Client) -> None:
+        """Loads pending reminders and starts the timer loop (safe to call on every on_ready)"""
+        self.client = client
+        if self._loop_task and not self._loop_task.done():
+            return
+
+        self._heap = [tuple(row) for row in self.conn.execute("SELECT due_at, reminder_id FROM reminders")]
+        heapq.heapify(self._heap)
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run())
+        logger.info("⏰ Reminder scheduler started with %s pending reminders", len(self._heap))
+
+    def add(self, channel_id: int, user_id: int, task: str, delay_seconds: float) -> int:
+        due_at = time.time() + delay_seconds
+        cursor = self.conn.execute(
+            "INSERT INTO reminders (channel_id, user_id, task, due_at) VALUES (?, ?, ?, ?)",
+            (channel_id, user_id, task, due_at)
+        )
+        self.conn.commit()
+        reminder_id = cursor.lastrowid
+
+        heapq.heappush(self._heap, (due_at, reminder_id))
+        if self._wakeup and self._heap[0][1] == reminder_id:
+            self._wakeup.set()  # new earliest reminder: re-arm the timer
+        return reminder_id
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._run_once()
+            except Exception:
+                # Never let one bad reminder (or a database hiccup) stop the timer loop
+                logger.error("❌ Reminder scheduler iteration failed", exc_info=True)
+                await asyncio.sleep(1)
+
+    async def _run_once(self) -> None:
+        """Waits for the earliest reminder (or a re-arm) and fires it if due"""
+        if not self._heap:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            return
+
+        delay = self._heap[0][0] - time.time()
+        if delay > 0:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            return
+
+        _, reminder_id = heapq.heappop(self._heap)
+        await self._fire(reminder_id)
+
+    async def _fire(self, reminder_id: int) -> None:
+        row = self.conn.execute(
+            "SELECT channel_id, user_id, task, attempts FROM reminders WHERE reminder_id = ?", (reminder_id,)
+        ).fetchone()
+        if row is None:
+            return
+        channel_id, user_id, task, attempts = row
+
+        try:
+            channel = self.client.get_channel(channel_id) or await self.client.fetch_channel(channel_id)
+            await channel.send(f"🔔 Hey <@{user_id}>, just a reminder to: {task}")
+        except (discord.NotFound, discord.Forbidden) as e:
+            # The channel is gone or unreadable: retrying cannot help
+            logger.error("❌ Dropping reminder %s, channel %s is unavailable: %s", reminder_id, channel_id, e)
+        except Exception as e:
+            attempts += 1
+            if attempts < REMINDER_MAX_ATTEMPTS:
+                self._reschedule(reminder_id, attempts)
+                logger.warning("⚠️ Could not deliver reminder %s (attempt %s), retrying: %s", reminder_id, attempts, e)
+                return
+            logger.error("❌ Giving up on reminder %s after %s attempts: %s", reminder_id, attempts, e)
+
+        self.conn.execute("DELETE FROM reminders WHERE reminder_id = ?", (reminder_id,))
+        self.conn.commit()
+
+    def _reschedule(self, reminder_id: int, attempts: int) -> None:
+        due_at = time.time() + min(REMINDER_RETRY_MAX, REMINDER_RETRY_BASE * 2 ** (attempts - 1))
+        self.conn.execute(
+            "UPDATE reminders SET due_at = ?, attempts = ? WHERE reminder_id = ?", (due_at, attempts, reminder_id)
+        )
+        self.conn.commit()
+        heapq.heappush(self._heap, (due_at, reminder_id))
+
+
+# Shared, process-wide reminder scheduler
+reminder_scheduler = ReminderScheduler()
+
+
+def is_reminder_candidate(message: Message) -> bool:
+    """Cheap pre-screen: only messages containing the trigger phrase can be reminders"""
+    return REMINDER_TRIGGER in message.content.lower()
+
+
 async def handle_event_or_reminder(message: Message) -> bool:
     content = message.content.lower()
+    if REMINDER_TRIGGER not in content:
+        return False
 
     reminder_match = REMINDER_REGEX.search(content)
     if reminder_match:
@@ -18,18 +173,9 @@ async def handle_event_or_reminder(message: Message) -> bool:
         unit = reminder_match.group(3)
 
         delay_seconds = convert_to_seconds(amount, unit)
-        remind_time = datetime.utcnow() + timedelta(seconds=delay_seconds)
-
-        scheduled_reminders.append({
-            'user': message.author,
-            'channel': message.channel,
-            'task': task,
-            'time': remind_time
-        })
+        reminder_scheduler.add(message.channel.id, message.author.id, task, delay_seconds)
 
         await message.channel.send(f"⏰ Okay {message.author.mention}, I will remind you to '{task}' in {amount} {unit}.")
-        asyncio.create_task(send_reminder(message.author, message.channel, task, delay_seconds))
-
         return True
 
     return False
@@ -46,8 +192,3 @@ def convert_to_seconds(amount: int, unit: str) -> int:
     elif 'day' in unit:
         return amount * 86400
     return amount
-
-
-async def send_reminder(user: User, channel: TextChannel, task: str, delay: int):
-    await asyncio.sleep(delay)
-    await channel.send(f"🔔 Hey {user.mention}, just a reminder to: {task}")
@@ -0,0 +1,14 @@
+from collections import defaultdict
+
+# Per-guild state version, bumped whenever guild, role or channel state changes.
+# Anything derived from guild state (cached replies, rendered context) keys on it.
+guild_versions = defaultdict(int)
+
+
+def get_guild_version(guild_id: int) -> int:
+    return guild_versions[guild_id]
+
+
+def bump_guild_version(guild_id: int) -> int:
+    guild_versions[guild_id] += 1
+    return guild_versions[guild_id]
@@ -1,46 +1,62 @@
 import asyncio
 import logging
+import os
+import time
+from collections import OrderedDict
 from typing import List, Tuple, Set
 import discord
-from src.components.agents.GroqAgent import agent
-from src.components.utils.intentClassifier import is_helpful_category, is_helpful_channel
-
-# Set up comprehensive logging with UTF-8 encoding
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('discord_bot.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-
-# Configure the console handler to use UTF-8 encoding
-console_handler = None
-for handler in logging.getLogger().handlers:
-    if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
-        console_handler = handler
-        break
-
-if console_handler:
-    # Set UTF-8 encoding for console output
-    import sys
-    if hasattr(sys.stdout, 'reconfigure'):
-        sys.stdout.reconfigure(encoding='utf-8')
-    if hasattr(sys.stderr, 'reconfigure'):
-        sys.stderr.reconfigure(encoding='utf-8')
-        
-# Suppress verbose httpx logs
-logging.getLogger("httpx").setLevel(logging.WARNING)
+from src.components.agents.modelRouter import model_router
+from src.components.utils.personalityManager import get_personality
+from src.components.utils.intentClassifier import is_helpful_category, is_helpful_channel, rank_helpful_channels
+from src.components.utils.channelProfiles import channel_profiles
+from src.components.utils.channelPermissions import channel_permissions
+from src.components.utils.messageIndex import message_index, extract_message_content
+from src.components.utils.passageRanker import rank_passages
+from src.components.utils.promptBudget import PromptSection, assemble_prompt
+from src.components.utils.streamingReply import STREAM_REPLIES, stream_agent_reply
+from src.components.utils.metrics import time_stage
+from src.components.utils.resolverStats import help_search_stats
 
 logger = logging.getLogger('HelpResolver')
 
+# Retrieval limits for the help summary prompt
+HELP_TOP_K_PASSAGES = 30
+HELP_PASSAGE_TOKEN_BUDGET = 2000
+# Channel selection: "profiles" (local match, batched LLM ranking when nothing matches), "batched" or "per_channel"
+HELP_RANKING_MODE = os.getenv("HELP_RANKING_MODE", "profiles").lower()
+# The resolver is long-lived, so its classification caches are LRU-bounded
+HELP_CACHE_MAX_ENTRIES = int(os.getenv("HELP_CACHE_MAX_ENTRIES", "2000"))
+
+
+class LRUCache(OrderedDict):
+    """Dict that evicts the least recently used entry beyond `max_entries`"""
+
+    def __init__(self, max_entries: int = HELP_CACHE_MAX_ENTRIES):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.max_entries:
+            self.popitem(last=False)
+
 class OptimizedHelpResolver:
-    def __init__(self, batch_size: int = 3, max_messages_per_channel: int =100):
+    def __init__(self, batch_size: int = 3, max_messages_per_channel: int =100,
+                 ranking_mode: str = "profiles", max_ranked_channels: int = 7):
         self.batch_size = batch_size
         self.max_messages_per_channel = max_messages_per_channel
-        self.category_cache = {}  # Cache category classifications
-        self.channel_cache = {}   # Cache channel classifications
+        # "profiles" (local profile match, batched ranking as fallback), "batched" (one LLM call) or "per_channel" (one call per channel)
+        self.ranking_mode = ranking_mode
+        self.max_ranked_channels = max_ranked_channels
+        self.category_cache = LRUCache()  # Cache category classifications
+        self.channel_cache = LRUCache()   # Cache channel classifications
+        # Lifetime counters; latency percentiles and per-guild breakdowns live in help_search_stats
         self.stats = {
             'total_searches': 0,
             'cache_hits': 0,
@@ -50,7 +66,7 @@ class OptimizedHelpResolver:
         
     async def batch_classify_categories(self, categories: List[discord.CategoryChannel], user_message: str) -> List[discord.CategoryChannel]:
         """Classify multiple categories in parallel batches"""
-        logger.info(f"🏷️ Starting category classification for {len(categories)} categories")
+        logger.info("🏷️ Starting category classification for %s categories", len(categories))
         helpful_categories = []
         cache_hits = 0
         api_calls = 0
@@ -58,7 +74,7 @@ class OptimizedHelpResolver:
         # Process categories in batches to avoid rate limits
         for i in range(0, len(categories), self.batch_size):
             batch = categories[i:i + self.batch_size]
-            logger.debug(f"📦 Processing category batch {i//self.batch_size + 1}: {[c.name for c in batch]}")
+            logger.debug("📦 Processing category batch %s: %s", i//self.batch_size + 1, [c.name for c in batch])
             
             # Create classification tasks for this batch
             tasks = []
@@ -68,9 +84,9 @@ class OptimizedHelpResolver:
                     cache_hits += 1
                     if self.category_cache[cache_key]:
                         helpful_categories.append(category)
-                        logger.debug(f"💾 Cache hit for category: {category.name} (helpful)")
+                        logger.debug("💾 Cache hit for category: %s (helpful)", category.name)
                     else:
-                        logger.debug(f"💾 Cache hit for category: {category.name} (not helpful)")
+                        logger.debug("💾 Cache hit for category: %s (not helpful)", category.name)
                     continue
                 
                 tasks.append(self._classify_category_with_cache(category, user_message, cache_key))
@@ -78,22 +94,22 @@ class OptimizedHelpResolver:
             
             # Wait for batch to complete
             if tasks:
-                logger.debug(f"🔄 Executing {len(tasks)} classification tasks")
+                logger.debug("🔄 Executing %s classification tasks", len(tasks))
                 batch_results = await asyncio.gather(*tasks, return_exceptions=True)
                 
                 for j, result in enumerate(batch_results):
                     if isinstance(result, Exception):
-                        logger.error(f"❌ Error classifying category {batch[j].name}: {result}")
+                        logger.error("❌ Error classifying category %s: %s", batch[j].name, result)
                         continue
                     
                     category, is_helpful = result
                     if is_helpful:
                         helpful_categories.append(category)
-                        logger.info(f"✅ Category '{category.name}' marked as helpful")
+                        logger.info("✅ Category '%s' marked as helpful", category.name)
                     else:
-                        logger.debug(f"⚪ Category '{category.name}' marked as not helpful")
+                        logger.debug("⚪ Category '%s' marked as not helpful", category.name)
         
-        logger.info(f"🎯 Category classification complete: {len(helpful_categories)}/{len(categories)} helpful (Cache hits: {cache_hits}, API calls: {api_calls})")
+        logger.info("🎯 Category classification complete: %s/%s helpful (Cache hits: %s, API calls: %s)", len(helpful_categories), len(categories), cache_hits, api_calls)
         self.stats['cache_hits'] += cache_hits
         self.stats['api_calls'] += api_calls
         return helpful_categories
@@ -101,18 +117,18 @@ class OptimizedHelpResolver:
     async def _classify_category_with_cache(self, category: discord.CategoryChannel, user_message: str, cache_key: str) -> Tuple[discord.CategoryChannel, bool]:
         """Classify a single category and cache the result"""
         try:
-            logger.debug(f"🔍 Classifying category: {category.name}")
-            is_helpful = await is_helpful_category(category.name, user_message)
+            logger.debug("🔍 Classifying category: %s", category.name)
+            is_helpful = await is_helpful_category(category.name, user_message, guild_id=category.guild.id)
             self.category_cache[cache_key] = is_helpful
-            logger.debug(f"💾 Cached result for category {category.name}: {is_helpful}")
+            logger.debug("💾 Cached result for category %s: %s", category.name, is_helpful)
             return category, is_helpful
         except Exception as e:
-            logger.error(f"❌ Error classifying category {category.name}: {e}")
+            logger.error("❌ Error classifying category %s: %s", category.name, e)
             return category, False
 
     async def batch_classify_channels(self, channels: List[discord.TextChannel], user_message: str) -> List[discord.TextChannel]:
         """Classify multiple channels in parallel batches"""
-        logger.info(f"📺 Starting channel classification for {len(channels)} channels")
+        logger.info("📺 Starting channel classification for %s channels", len(channels))
         helpful_channels = []
         cache_hits = 0
         api_calls = 0
@@ -120,7 +136,7 @@ class OptimizedHelpResolver:
         # Process channels in batches
         for i in range(0, len(channels), self.batch_size):
             batch = channels[i:i + self.batch_size]
-            logger.debug(f"📦 Processing channel batch {i//self.batch_size + 1}: {[c.name for c in batch]}")
+            logger.debug("📦 Processing channel batch %s: %s", i//self.batch_size + 1, [c.name for c in batch])
             
             tasks = []
             for channel in batch:
@@ -129,80 +145,130 @@ class OptimizedHelpResolver:
                     cache_hits += 1
                     if self.channel_cache[cache_key]:
                         helpful_channels.append(channel)
-                        logger.debug(f"💾 Cache hit for channel: #{channel.name} (helpful)")
+                        logger.debug("💾 Cache hit for channel: #%s (helpful)", channel.name)
                     else:
-                        logger.debug(f"💾 Cache hit for channel: #{channel.name} (not helpful)")
+                        logger.debug("💾 Cache hit for channel: #%s (not helpful)", channel.name)
                     continue
                 
                 tasks.append(self._classify_channel_with_cache(channel, user_message, cache_key))
                 api_calls += 1
             
             if tasks:
-                logger.debug(f"🔄 Executing {len(tasks)} channel classification tasks")
+                logger.debug("🔄 Executing %s channel classification tasks", len(tasks))
                 batch_results = await asyncio.gather(*tasks, return_exceptions=True)
                 
                 for j, result in enumerate(batch_results):
                     if isinstance(result, Exception):
-                        logger.error(f"❌ Error classifying channel {batch[j].name}: {result}")
+                        logger.error("❌ Error classifying channel %s: %s", batch[j].name, result)
                         continue
                     
                     channel, is_helpful = result
                     if is_helpful:
                         helpful_channels.append(channel)
-                        logger.info(f"✅ Channel '#{channel.name}' marked as helpful")
+                        logger.info("✅ Channel '#%s' marked as helpful", channel.name)
                     else:
-                        logger.debug(f"⚪ Channel '#{channel.name}' marked as not helpful")
+                        logger.debug("⚪ Channel '#%s' marked as not helpful", channel.name)
         
-        logger.info(f"🎯 Channel classification complete: {len(helpful_channels)}/{len(channels)} helpful (Cache hits: {cache_hits}, API calls: {api_calls})")
+        logger.info("🎯 Channel classification complete: %s/%s helpful (Cache hits: %s, API calls: %s)", len(helpful_channels), len(channels), cache_hits, api_calls)
         self.stats['cache_hits'] += cache_hits
         self.stats['api_calls'] += api_calls
         return helpful_channels
 
+    async def rank_channels_batched(self, channels: List[discord.TextChannel], user_message: str) -> List[discord.TextChannel]:
+        """Rank all candidate channels with a single LLM call"""
+        logger.info("📺 Starting batched channel ranking for %s channels", len(channels))
+        cache_key = f"{user_message}:" + "|".join(f"{c.id}:{c.topic or ''}" for c in channels)
+        if cache_key in self.channel_cache:
+            self.stats['cache_hits'] += 1
+            logger.debug("💾 Cache hit for batched channel ranking")
+            return self.channel_cache[cache_key]
+
+        ranked_indices = await rank_helpful_channels(
+            [(channel.name, channel.topic or "") for channel in channels],
+            user_message,
+            max_results=self.max_ranked_channels,
+            guild_id=channels[0].guild.id if channels else None
+        )
+        self.stats['api_calls'] += 1
+
+        if ranked_indices is None:
+            # Don't cache a failed call (timeout, 429): fall back to the local profile match, then per-channel
+            logger.warning("⚠️ Batched channel ranking failed, falling back")
+            guild = channels[0].guild
+            candidate_ids = {channel.id for channel in channels}
+            fallback = [c for c in self.match_channel_profiles(guild, user_message) if c.id in candidate_ids]
+            return fallback or await self.batch_classify_channels(channels, user_message)
+
+        ranked_channels = [channels[i] for i in ranked_indices]
+        if ranked_channels:
+            self.channel_cache[cache_key] = ranked_channels
+        logger.info("🎯 Batched ranking complete: %s (API calls: 1)", [f'#{c.name}' for c in ranked_channels])
+        return ranked_channels
+
+    def match_channel_profiles(self, guild: discord.Guild, user_message: str) -> List[discord.TextChannel]:
+        """Match the query against the persistent channel profiles locally, without any LLM call"""
+        matches = channel_profiles.match(
+            guild, user_message, limit=self.max_ranked_channels,
+            readable_ids=channel_permissions.readable_channel_ids(guild)
+        )
+        channels = [guild.get_channel(channel_id) for channel_id, _ in matches]
+        channels = [channel for channel in channels if isinstance(channel, discord.TextChannel)]
+        logger.info("🗂️ Profile match selected %s", [f'#{c.name}' for c in channels])
+        return channels
+
     async def _classify_channel_with_cache(self, channel: discord.TextChannel, user_message: str, cache_key: str) -> Tuple[discord.TextChannel, bool]:
         """Classify a single channel and cache the result"""
         try:
-            logger.debug(f"🔍 Classifying channel: #{channel.name}")
+            logger.debug("🔍 Classifying channel: #%s", channel.name)
             topic = channel.topic or ""
-            is_helpful = await is_helpful_channel(channel.name, user_message, topic)
+            is_helpful = await is_helpful_channel(channel.name, user_message, topic, guild_id=channel.guild.id)
             self.channel_cache[cache_key] = is_helpful
-            logger.debug(f"💾 Cached result for channel #{channel.name}: {is_helpful}")
+            logger.debug("💾 Cached result for channel #%s: %s", channel.name, is_helpful)
             return channel, is_helpful
         except Exception as e:
-            logger.error(f"❌ Error classifying channel #{channel.name}: {e}")
+            logger.error("❌ Error classifying channel #%s: %s", channel.name, e)
             return channel, False
 
     async def parallel_message_collection(self, channels: List[discord.TextChannel], guild: discord.Guild) -> List[Tuple[str, str, str]]:
         """Collect messages from multiple channels in parallel"""
-        logger.info(f"📨 Starting message collection from {len(channels)} channels")
+        logger.info("📨 Starting message collection from %s channels", len(channels))
         
         tasks = []
         for channel in channels:
             tasks.append(self._collect_channel_messages(channel, guild))
         
         # Collect all messages in parallel
-        logger.debug(f"🔄 Executing {len(tasks)} message collection tasks")
-        channel_results = await asyncio.gather(*tasks, return_exceptions=True)
+        logger.debug("🔄 Executing %s message collection tasks", len(tasks))
+        with time_stage("history_fetch"):
+            channel_results = await asyncio.gather(*tasks, return_exceptions=True)
         
         all_messages = []
         successful_channels = 0
         for i, result in enumerate(channel_results):
             if isinstance(result, Exception):
-                logger.error(f"❌ Error collecting messages from #{channels[i].name}: {result}")
+                logger.error("❌ Error collecting messages from #%s: %s", channels[i].name, result)
                 continue
             
             successful_channels += 1
             channel_message_count = len(result)
-            logger.debug(f"📊 Collected {channel_message_count} messages from #{channels[i].name}")
+            logger.debug("📊 Collected %s messages from #%s", channel_message_count, channels[i].name)
             all_messages.extend(result)
         
-        logger.info(f"📊 Message collection complete: {len(all_messages)} total messages from {successful_channels}/{len(channels)} channels")
+        logger.info("📊 Message collection complete: %s total messages from %s/%s channels", len(all_messages), successful_channels, len(channels))
         return all_messages
 
     async def _collect_channel_messages(self, channel: discord.TextChannel, guild: discord.Guild) -> List[Tuple[str, str, str]]:
-        """Collect messages from a single channel"""
+        """Collect messages from a single channel, from the local index when it has been backfilled"""
+        if message_index.is_backfilled(channel.id):
+            messages = message_index.get_channel_messages(
+                channel, limit=self.max_messages_per_channel, exclude_author_id=guild.me.id
+            )
+            logger.info("📖 Read %s messages for #%s from the local index", len(messages), channel.name)
+            return messages
+
         messages = []
         try:
-            logger.debug(f"📖 Reading messages from #{channel.name} (limit: {self.max_messages_per_channel})")
+            logger.debug("📖 Reading messages from #%s (limit: %s)", channel.name, self.max_messages_per_channel)
             message_count = 0
             
             async for message in channel.history(limit=self.max_messages_per_channel):
@@ -210,40 +276,35 @@ class OptimizedHelpResolver:
                 if message.author.id == guild.me.id:
                     continue
                 
-                # Get text content
-                text_content = message.content.strip()
-                
-                # Extract embed content
-                embed_content = ""
-                for embed in message.embeds:
-                    title = embed.title or ""
-                    desc = embed.description or ""
-                    fields = "\n".join(f"{f.name}: {f.value}" for f in embed.fields)
-                    embed_content += f"{title}\n{desc}\n{fields}\n"
-                
-                full_content = (text_content + "\n" + embed_content).strip()
+                full_content = extract_message_content(message)
                 
                 if full_content:
                     messages.append((channel.name, message.author.display_name, full_content))
                     message_count += 1
             
-            logger.debug(f"✅ Successfully collected {message_count} messages from #{channel.name}")
-            logger.debug(f"📖 Finished reading messages from #{channel.name}")
-            logger.info(f"📖 Collected {len(messages)} messages from #{channel.name}")
-            logger.info(f"📖 Messages: {messages}")
+            logger.debug("✅ Successfully collected %s messages from #%s", message_count, channel.name)
+            logger.debug("📖 Finished reading messages from #%s", channel.name)
+            logger.info("📖 Collected %s messages from #%s", len(messages), channel.name)
                     
         except Exception as e:
-            logger.error(f"❌ Error collecting messages from #{channel.name}: {e}")
+            logger.error("❌ Error collecting messages from #%s: %s", channel.name, e)
         
         return messages
 
     async def smart_search_with_keywords(self, guild: discord.Guild, user_message: str) -> List[Tuple[str, str, str]]:
         """Use keyword-based pre-filtering before AI classification"""
-        logger.info(f"🚀 Starting smart search in server '{guild.name}' for query: '{user_message}'")
+        logger.info("🚀 Starting smart search in server '%s' for query: '%s'", guild.name, user_message)
+
+        if self.ranking_mode == "profiles":
+            with time_stage("channel_classification"):
+                helpful_channels = self.match_channel_profiles(guild, user_message)
+            if helpful_channels:
+                return await self.parallel_message_collection(helpful_channels, guild)
+            logger.info("🔁 No channel profiles matched the query; falling back to batched ranking")
         
         # Extract potential keywords from user message
         keywords = self._extract_keywords(user_message.lower())
-        logger.info(f"🔍 Extracted keywords: {list(keywords)}")
+        logger.info("🔍 Extracted keywords: %s", list(keywords))
         
         # Pre-filter channels based on keywords
         candidate_channels = []
@@ -254,7 +315,7 @@ class OptimizedHelpResolver:
             if any(keyword in category.name.lower() for keyword in keywords):
                 candidate_channels.extend(category.text_channels)
                 keyword_matched_channels += len(category.text_channels)
-                logger.debug(f"🎯 Category '{category.name}' matched keywords - added {len(category.text_channels)} channels")
+                logger.debug("🎯 Category '%s' matched keywords - added %s channels", category.name, len(category.text_channels))
                 continue
                 
             # Check channel names and topics
@@ -263,7 +324,7 @@ class OptimizedHelpResolver:
                 if any(keyword in channel_text for keyword in keywords):
                     candidate_channels.append(channel)
                     keyword_matched_channels += 1
-                    logger.debug(f"🎯 Channel '#{channel.name}' matched keywords")
+                    logger.debug("🎯 Channel '#%s' matched keywords", channel.name)
         
         # Also include channels with generic help-related names
         help_keywords = ['help', 'support', 'question', 'ask', 'general', 'chat', 'discussion', 'info', 'faq', 'announcements', 'tournament', 'event']
@@ -275,14 +336,24 @@ class OptimizedHelpResolver:
                     if channel not in candidate_channels:
                         candidate_channels.append(channel)
                         help_matched_channels += 1
-                        logger.debug(f"🆘 Channel '#{channel.name}' matched help keywords")
+                        logger.debug("🆘 Channel '#%s' matched help keywords", channel.name)
         
-        logger.info(f"🎯 Pre-filtering complete: {len(candidate_channels)} candidate channels (Keyword: {keyword_matched_channels}, Help: {help_matched_channels})")
+        logger.info("🎯 Pre-filtering complete: %s candidate channels (Keyword: %s, Help: %s)", len(candidate_channels), keyword_matched_channels, help_matched_channels)
+
+        # Drop channels the bot cannot read before spending classification or fetch work on them
+        readable_channels = channel_permissions.filter_readable(guild, candidate_channels)
+        if len(readable_channels) < len(candidate_channels):
+            logger.info("🔐 Skipped %s unreadable candidate channels", len(candidate_channels) - len(readable_channels))
+        candidate_channels = readable_channels
         
         # Now use AI classification only on candidate channels
         if candidate_channels:
-            helpful_channels = await self.batch_classify_channels(candidate_channels, user_message)
-            logger.info(f"✅ AI classified {len(helpful_channels)} channels as helpful")
+            with time_stage("channel_classification"):
+                if self.ranking_mode in ("batched", "profiles"):
+                    helpful_channels = await self.rank_channels_batched(candidate_channels, user_message)
+                else:
+                    helpful_channels = await self.batch_classify_channels(candidate_channels, user_message)
+            logger.info("✅ AI classified %s channels as helpful", len(helpful_channels))
             
             # Collect messages in parallel
             return await self.parallel_message_collection(helpful_channels, guild)
@@ -298,43 +369,68 @@ class OptimizedHelpResolver:
         words = message.replace('?', '').replace('!', '').replace('.', '').split()
         keywords = {word for word in words if len(word) > 2 and word not in stop_words}
         
-        logger.debug(f"🔤 Keyword extraction: '{message}' → {keywords}")
+        logger.debug("🔤 Keyword extraction: '%s' → %s", message, keywords)
         return keywords
 
+    def record_search(self, guild: discord.Guild, response_time: float, messages_collected: int) -> None:
+        """Folds one finished search into the lifetime counters and the rolling-window stats"""
+        self.stats['total_searches'] += 1
+        self.stats['avg_response_time'] += (response_time - self.stats['avg_response_time']) / self.stats['total_searches']
+        help_search_stats.record(guild.id, response_time, messages_collected)
+
+    def snapshot(self) -> dict:
+        """Resolver counters plus rolling-window latency percentiles, overall and per guild"""
+        snapshot = help_search_stats.snapshot()
+        snapshot['resolver'] = {
+            **self.stats,
+            'category_cache_entries': len(self.category_cache),
+            'channel_cache_entries': len(self.channel_cache),
+        }
+        return snapshot
+
     def log_performance_stats(self):
         """Log current performance statistics"""
-        logger.info(f"📊 Performance Stats - Total searches: {self.stats['total_searches']}, "
-                   f"Cache hits: {self.stats['cache_hits']}, API calls: {self.stats['api_calls']}, "
-                   f"Avg response time: {self.stats['avg_response_time']:.2f}s")
+        window = help_search_stats.snapshot()['window']
+        if not window['searches']:
+            return
+        logger.info("📊 Performance Stats - Total searches: %s, Cache hits: %s, API calls: %s, Avg response time: %.2fs, "
+                    "last %ss: %s searches, p50 %.2fs, p95 %.2fs, p99 %.2fs",
+                    self.stats['total_searches'], self.stats['cache_hits'], self.stats['api_calls'],
+                    self.stats['avg_response_time'], help_search_stats.window_seconds, window['searches'],
+                    window['p50_latency'], window['p95_latency'], window['p99_latency'])
+
+
+# Process-wide resolver: its caches and stats survive across help requests
+help_resolver = OptimizedHelpResolver(batch_size=3, max_messages_per_channel=100, ranking_mode=HELP_RANKING_MODE)
+
+
+def get_help_resolver_stats() -> dict:
+    return help_resolver.snapshot()
+
 
 # Updated main function
-async def search_messages_for_help_optimized(guild: discord.Guild, message: discord.Message, limit_per_channel=100):
+async def search_messages_for_help_optimized(guild: discord.Guild, message: discord.Message):
     """Optimized version of the help search function"""
-    resolver = OptimizedHelpResolver(batch_size=3, max_messages_per_channel=limit_per_channel)
-    
-    logger.info(f"🚀 Starting optimized help search for user {message.author.display_name} in server '{guild.name}'")
-    logger.info(f"📝 User query: '{message.content}'")
-    start_time = asyncio.get_event_loop().time()
-    
-    # Update stats
-    resolver.stats['total_searches'] += 1
-    
+    resolver = help_resolver
+
+    logger.info("🚀 Starting optimized help search for user %s in server '%s'", message.author.display_name, guild.name)
+    logger.info("📝 User query: '%s'", message.content)
+    start_time = time.perf_counter()
+
     # Use smart keyword-based search with AI classification
-    collected_messages = await resolver.smart_search_with_keywords(guild, message.content)
-    
-    end_time = asyncio.get_event_loop().time()
-    response_time = end_time - start_time
-    
-    # Update average response time
-    resolver.stats['avg_response_time'] = (
-        (resolver.stats['avg_response_time'] * (resolver.stats['total_searches'] - 1) + response_time) / 
-        resolver.stats['total_searches']
-    )
-    
-    logger.info(f"⏱️ Search completed in {response_time:.2f} seconds")
-    logger.info(f"📊 Final results: {len(collected_messages)} messages collected")
+    try:
+        collected_messages = await resolver.smart_search_with_keywords(guild, message.content)
+    except Exception:
+        help_search_stats.record_error()
+        raise
+
+    response_time = time.perf_counter() - start_time
+    resolver.record_search(guild, response_time, len(collected_messages))
+
+    logger.info("⏱️ Search completed in %.2f seconds", response_time)
+    logger.info("📊 Final results: %s messages collected", len(collected_messages))
     resolver.log_performance_stats()
-    
+
     return collected_messages
 
 # Updated handle_help_request function with user feedback
@@ -343,7 +439,7 @@ async def handle_help_request_optimized(message: discord.Message):
     guild = message.guild
     user_mention = message.author.mention
     
-    logger.info(f"🆘 Help request from {message.author.display_name} ({message.author.id}): '{message.content}'")
+    logger.info("🆘 Help request from %s (%s): '%s'", message.author.display_name, message.author.id, message.content)
     
     # Send initial acknowledgment message
     thinking_message = await message.channel.send(f"{user_mention} 🔍 Searching through the server for helpful information... This might take a moment!")
@@ -358,37 +454,54 @@ async def handle_help_request_optimized(message: discord.Message):
             await thinking_message.edit(content=f"{user_mention} I couldn't find any relevant help information in the server.")
             return
 
-        # Limit to most relevant messages
-        limited_messages = help_messages[:100]
-        logger.info(f"📋 Using {len(limited_messages)} most relevant messages for response generation")
-        
-        combined = "\n".join(
-            f"[#{ch}] {author}: {content}" for ch, author, content in limited_messages
-        )
+        with time_stage("prompt_building"):
+            # Keep only the most relevant messages that fit the prompt budget
+            limited_messages = rank_passages(
+                message.content, help_messages,
+                top_k=HELP_TOP_K_PASSAGES, token_budget=HELP_PASSAGE_TOKEN_BUDGET
+            )
+            logger.info("📋 Using %s most relevant messages for response generation", len(limited_messages))
+            
+            combined = "\n".join(
+                f"[#{ch}] {author}: {content}" for ch, author, content in limited_messages
+            )
+
+            help_summary_prompt = assemble_prompt([
+                PromptSection("question", f"The user said: '{message.content}'.", priority=0, required=True),
+                PromptSection("passages", f"""Here are the server messages most relevant to their question:
+
+{combined}""", priority=2),
+                PromptSection("instructions", """Based on the above, provide a useful, helpful response. If you can answer their question directly, do so.
+If not, summarize what kinds of help or information is available.""", priority=1, required=True),
+            ])
 
         # Update user that we're generating response
         await thinking_message.edit(content=f"{user_mention} ✨ Found relevant information! Generating your personalized response...")
         
         logger.info("🤖 Generating AI response...")
-        help_summary_prompt = f"""
-        The user said: '{message.content}'.
-        Here are some recent messages that might be helpful:
-
-        {combined}
 
-        Based on the above, provide a useful, helpful response. If you can answer their question directly, do so. 
-        If not, summarize what kinds of help or information is available.
-        """
-
-        response = await agent.arun(message=help_summary_prompt)
-        final_response = getattr(response, 'content', "🤖 I tried, but couldn't generate a helpful answer.")
-        
-        # Send final response
-        await thinking_message.edit(content=f"{user_mention} {final_response}")
+        personality = get_personality(guild.id)
+        if STREAM_REPLIES:
+            # Stream the answer into the "thinking" message as it is generated
+            await model_router.run_exclusive(
+                guild, personality,
+                lambda guild_agent: stream_agent_reply(
+                    guild_agent, help_summary_prompt, message.channel, prefix=f"{user_mention} ",
+                    reply_message=thinking_message,
+                    fallback="🤖 I tried, but couldn't generate a helpful answer."
+                )
+            )
+        else:
+            response = await model_router.generate(guild, personality, help_summary_prompt)
+            final_response = getattr(response, 'content', "🤖 I tried, but couldn't generate a helpful answer.")
+            
+            # Send final response
+            with time_stage("discord_send"):
+                await thinking_message.edit(content=f"{user_mention} {final_response}")
         logger.info("✅ Help request successfully handled")
         
     except Exception as e:
-        logger.error(f"❌ Error handling help request: {e}")
+        logger.error("❌ Error handling help request: %s", e)
         await thinking_message.edit(content=f"{user_mention} Sorry, I encountered an error while searching for help. Please try again later.")
         
     logger.info("🏁 Help request processing complete")
\ No newline at end of file
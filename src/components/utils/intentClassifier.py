@@ -1,12 +1,19 @@
-from agno.agent import Agent
-from agno.models.groq import Groq
-import os
-
-# A separate low-temp model just for classification (or reuse your agent)
-intent_agent = Agent(
-    model=Groq(id="llama-3.3-70b-versatile", api_key=os.getenv("GROQ_API_KEY"), temperature=0),
-    tools=[],
-    instructions="""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import re
+from src.components.agents.classifierRegistry import classifier_backend, register_classifier, get_classifier, warm_up_classifiers
+from src.components.utils.llmScheduler import llm_scheduler, PRIORITY_INTERACTIVE, PRIORITY_CLASSIFICATION
+from src.components.utils.intentModel import log_intent_decision
+# TIER 1: deterministic rules, kept dependency-free in intentRules and re-exported here
+from src.components.utils.intentRules import (
+    INTENT_LABELS, RULE_CONFIDENCE_THRESHOLD, HELP_PATTERN, SMALL_TALK_PATTERN, SERVER_INFO_PATTERN,
+    USER_INFO_PATTERN, LEADING_MENTIONS_PATTERN, parse_intent_label, classify_intent_by_rules
+)
+from src.components.utils.metrics import INTENT_DECISIONS
+
+logger = logging.getLogger('IntentClassifier')
+
+INTENT_INSTRUCTIONS = """
         ### ROLE & CONTEXT:
         "You are an expert intent classifier for Discord messages. Analyze the message content and context carefully."
         "Your task is to classify each message into exactly ONE of these four intents based on the PRIMARY PURPOSE of the message:"
@@ -55,61 +62,137 @@ intent_agent = Agent(
         When in doubt between two intents choose 'general' as the safe default.
  
         REMEMBER: Tags/mentions do NOT automatically mean user_info. Focus on what the user actually wants to achieve.
-    """,
-    show_tool_calls=True,
-    markdown=False,
-)
+    """
+
+
+CHANNEL_CLASSIFIER_INSTRUCTIONS = [
+    # Clear role and context
+    "You are a Discord channel classifier.",
+    "Your job is to determine if a specific Discord channel would likely contain helpful information for a user's question.",
+    
+    # Decision criteria
+    "DECISION CRITERIA:",
+    "Answer 'yes' if the channel name or topic suggests it contains:",
+    "- Help or support content",
+    "- Information relevant to the user's question",
+    "- Resources or guides related to the query",
+    "- Q&A or discussion about similar topics",
+    "- Sometimes casual chat such as 'general' and 'announcements' channels can be helpful",
+    
+    "Answer 'no' if the channel appears to be for:",
+    "- Casual chat or off-topic discussion",
+    "- Specific games or activities unrelated to the query",
+    "- Announcements only",
+    "- Private or restricted content",
+    
+    # Output format
+    "IMPORTANT: Respond with only 'yes' or 'no'.",
+    "No explanations or additional text.",
+    "If uncertain, answer 'no'."
+]
+
+CATEGORY_CLASSIFIER_INSTRUCTIONS = [
+    "You are a classifier that determines if a Discord Guild Category is likely to contain messages that are helpful or support questions regarding the user query.",
+    "Your task is to analyze the category name and user's message, and decide if the category is likely to contain helpful messages or support questions.",
+    "Return 'yes' if the category is likely to contain helpful messages or support questions. Return 'no' otherwise.",
+    "Only return 'yes' or 'no'."
+]
+
+CHANNEL_RANKER_INSTRUCTIONS = [
+    "You are a Discord channel ranker.",
+    "You receive a numbered list of Discord channels (name and topic) and a user's question.",
+    "Rank the channels that would likely contain helpful information for the question, most helpful first.",
+
+    "DECISION CRITERIA:",
+    "- Prefer help, support, FAQ, schedule, event and announcement channels related to the question",
+    "- Prefer channels whose name or topic matches the subject of the question",
+    "- Leave out channels for unrelated games, activities or off-topic chat",
+
+    "OUTPUT FORMAT:",
+    "Respond with ONLY a JSON array of channel numbers, e.g. [3, 1, 7], respecting the requested maximum.",
+    "Return [] if no channel is likely to help.",
+    "No explanations or additional text."
+]
+
+# Classifier models are built once and shared; each call gets a fresh agent (see classifierRegistry)
+register_classifier("intent", INTENT_INSTRUCTIONS)
+register_classifier("channel", CHANNEL_CLASSIFIER_INSTRUCTIONS)
+register_classifier("category", CATEGORY_CLASSIFIER_INSTRUCTIONS)
+register_classifier("channel_ranker", CHANNEL_RANKER_INSTRUCTIONS)
+
+# A separate low-temp model just for classification (small "classification" tier model by default)
+
+# Local model decisions below this confidence fall through to the LLM
+LOCAL_MODEL_CONFIDENCE_THRESHOLD = 0.8
+
+# TIER 2: optional lightweight local model, callable(message) -> (intent, confidence)
+_local_intent_model: Optional[Callable[[str], Tuple[str, float]]] = None
+
+
+def set_local_intent_model(model: Optional[Callable[[str], Tuple[str, float]]]) -> None:
+    """Registers (or clears) the local model used between the rule tier and the LLM."""
+    global _local_intent_model
+    _local_intent_model = model
+
+
+def get_local_intent_model() -> Optional[Callable[[str], Tuple[str, float]]]:
+    return _local_intent_model
+
+
+async def classify_intent_detailed(message: str, mention_count: int = 0, guild_id: Optional[int] = None,
+                                   log: bool = True) -> Dict[str, Any]:
+    """
+    Tiered intent classification: rules, then the optional local model, then the LLM.
+
+    Unless `log` is False (offline evaluation), every decision is appended to the intent
+    decision log, the training data for the local model, and counted in the metrics.
+
+    Returns:
+        Dict with the `intent`, the `confidence` of the decision and the `tier` that made it
+    """
+    decision = await _decide_intent(message, mention_count, guild_id)
+    if log:
+        log_intent_decision(message, decision)
+        INTENT_DECISIONS.inc(intent=decision["intent"], tier=decision["tier"])
+    return decision
+
+
+async def _decide_intent(message: str, mention_count: int, guild_id: Optional[int]) -> Dict[str, Any]:
+    decision = classify_intent_by_rules(message, mention_count)
+    if decision and decision["confidence"] >= RULE_CONFIDENCE_THRESHOLD:
+        return decision
+
+    if _local_intent_model is not None:
+        try:
+            intent, confidence = _local_intent_model(message)
+            if intent in INTENT_LABELS and confidence >= LOCAL_MODEL_CONFIDENCE_THRESHOLD:
+                return {"intent": intent, "confidence": confidence, "tier": "local_model"}
+        except Exception as e:
+            logger.error("Local intent model error: %s", e)
 
-async def classify_intent(message: str) -> str:
     try:
-        result = await intent_agent.arun(message=f"Classify this message: '{message}'")
-        intent = getattr(result, "content", "general").strip().lower()
-        if intent not in ["user_wants_help","server_info", "user_info", "general"]:
-            return "general"
-        return intent
+        result = await llm_scheduler.submit(
+            lambda: get_classifier("intent").arun(message=f"Classify this message: '{message}'"),
+            priority=PRIORITY_INTERACTIVE, guild_id=guild_id, backend=classifier_backend("intent")
+        )
+        intent = parse_intent_label(getattr(result, "content", None))
+        if intent is None:
+            return {"intent": "general", "confidence": 0.5, "tier": "llm"}
+        return {"intent": intent, "confidence": 0.9, "tier": "llm"}
     except Exception as e:
-        print("Intent classification error:", e)
-        return "general"
+        logger.error("Intent classification error: %s", e)
+        return {"intent": "general", "confidence": 0.0, "tier": "fallback"}
+
+
+async def classify_intent(message: str, mention_count: int = 0, guild_id: Optional[int] = None) -> str:
+    decision = await classify_intent_detailed(message, mention_count, guild_id)
+    return decision["intent"]
 
 
 # DYANMIC CHANNEL CLASSIFICATION
-async def is_helpful_channel(channel_name: str, message: str, topic: str = "") -> bool:
-    from agno.agent import Agent
-    from agno.models.groq import Groq
-    import os
-    print("Message in Params from User: ", message)
-
-    classifier = Agent(
-        model=Groq(id="llama-3.3-70b-versatile", api_key=os.getenv("GROQ_API_KEY"), temperature=0),
-        tools=[],
-        instructions= [
-            # Clear role and context
-            "You are a Discord channel classifier.",
-            "Your job is to determine if a specific Discord channel would likely contain helpful information for a user's question.",
-            
-            # Decision criteria
-            "DECISION CRITERIA:",
-            "Answer 'yes' if the channel name or topic suggests it contains:",
-            "- Help or support content",
-            "- Information relevant to the user's question",
-            "- Resources or guides related to the query",
-            "- Q&A or discussion about similar topics",
-            "- Sometimes casual chat such as 'general' and 'announcements' channels can be helpful",
-            
-            "Answer 'no' if the channel appears to be for:",
-            "- Casual chat or off-topic discussion",
-            "- Specific games or activities unrelated to the query",
-            "- Announcements only",
-            "- Private or restricted content",
-            
-            # Output format
-            "IMPORTANT: Respond with only 'yes' or 'no'.",
-            "No explanations or additional text.",
-            "If uncertain, answer 'no'."
-        ],
-        show_tool_calls=False,
-        markdown=False,
-    )
+async def is_helpful_channel(channel_name: str, message: str, topic: str = "", guild_id: Optional[int] = None) -> bool:
+    logger.debug("Message in Params from User: %s", message)
+
 
     prompt =  f"""
         CHANNEL ANALYSIS:
@@ -122,41 +205,93 @@ async def is_helpful_channel(channel_name: str, message: str, topic: str = "") -
         """
     
     try:
-        result = await classifier.arun(message=prompt)
+        result = await llm_scheduler.submit(
+            lambda: get_classifier("channel").arun(message=prompt), priority=PRIORITY_CLASSIFICATION, guild_id=guild_id,
+            backend=classifier_backend("channel")
+        )
         answer = getattr(result, "content", "").strip().lower()
         return answer == "yes"
     except Exception as e:
-        print(f"Channel help detection error: {e}")
+        logger.error("Channel help detection error: %s", e)
         return False
     
-async def is_helpful_category(category_name: str, message: str,) -> bool:
-    from agno.agent import Agent
-    from agno.models.groq import Groq
-    import os
-    print("Message in Params from User: ", message)
-
-    classifier = Agent(
-        model=Groq(id="llama-3.3-70b-versatile", api_key=os.getenv("GROQ_API_KEY"), temperature=0),
-        tools=[],
-        instructions= f"""
-            "You are a classifier that determines if a Discord Guild Category is likely to contain messages that are helpful or support questions regarding the user query: '{message}'.
-            "Your task is to analyze the category name and user's message, and decide if the category is likely to contain helpful messages or support questions.
-            "Return 'yes' if the category is likely to contain helpful messages or support questions. Return 'no' otherwise.",
-            "Only return 'yes' or 'no'."
-        """,
-        show_tool_calls=False,
-        markdown=False,
-    )
+async def is_helpful_category(category_name: str, message: str, guild_id: Optional[int] = None) -> bool:
+    logger.debug("Message in Params from User: %s", message)
+
 
     prompt = f"""
+    User query: '{message}'
     Category name: {category_name}
     Is this category likely to contain help-related messages: {message}? (yes/no)
     """
     
     try:
-        result = await classifier.arun(message=prompt)
+        result = await llm_scheduler.submit(
+            lambda: get_classifier("category").arun(message=prompt), priority=PRIORITY_CLASSIFICATION, guild_id=guild_id,
+            backend=classifier_backend("category")
+        )
         answer = getattr(result, "content", "").strip().lower()
         return answer == "yes" # returns Bool True if answer contains yes else returns False
     except Exception as e:
-        print(f"Channel help detection error: {e}")
+        logger.error("Channel help detection error: %s", e)
         return False
+
+
+# BATCHED CHANNEL RANKING
+async def rank_helpful_channels(channels: List[Tuple[str, str]], message: str, max_results: int = 7,
+                                guild_id: Optional[int] = None) -> Optional[List[int]]:
+    """
+    Ranks every candidate channel against the user's question in a single LLM call.
+
+    Args:
+        channels: (channel_name, channel_topic) pairs, in candidate order
+        message: The user's question
+        max_results: Maximum number of channels to return
+        guild_id: Guild the request is for (LLM scheduler fairness)
+
+    Returns:
+        Indices into `channels`, most helpful first, or None when the ranking call failed
+        (so callers can tell a failure from "no helpful channels" and avoid caching it).
+    """
+    if not channels:
+        return []
+
+
+    channel_lines = "\n".join(
+        f"{i}. #{name} - {topic if topic else 'No topic set'}" for i, (name, topic) in enumerate(channels, start=1)
+    )
+    prompt = f"""
+        CHANNELS:
+        {channel_lines}
+
+        User's Question: "{message}"
+
+        Return at most {max_results} channel numbers.
+        Ranked channel numbers:
+        """
+
+    try:
+        result = await llm_scheduler.submit(
+            lambda: get_classifier("channel_ranker").arun(message=prompt), priority=PRIORITY_CLASSIFICATION, guild_id=guild_id,
+            backend=classifier_backend("channel_ranker")
+        )
+        answer = getattr(result, "content", "") or ""
+        return _parse_channel_ranking(answer, len(channels), max_results)
+    except Exception as e:
+        logger.error("Channel ranking error: %s", e)
+        return None
+
+
+def _parse_channel_ranking(answer: str, channel_count: int, max_results: int) -> List[int]:
+    """Parses the ranker's answer into unique, in-range, zero-based channel indices."""
+    match = re.search(r"\[[^\]]*\]", answer)
+    numbers = re.findall(r"\d+", match.group(0) if match else answer)
+
+    ranked = []
+    for number in numbers:
+        index = int(number) - 1
+        if 0 <= index < channel_count and index not in ranked:
+            ranked.append(index)
+        if len(ranked) >= max_results:
+            break
+    return ranked
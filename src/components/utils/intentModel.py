@@ -0,0 +1,351 @@
+"""
+Local intent model trained from the bot's own logged decisions.
+
+Every classify_intent decision is appended to a JSONL decision log. The exporter
+turns that log into (message, intent) pairs, and a small TF-IDF + multinomial
+logistic regression model is trained on them in pure Python and saved as JSON.
+At startup the bot loads the model as the local tier of the intent classifier,
+so the LLM is only asked when the local model is not confident.
+
+Training refuses data with fewer than two labels or too few samples per label, and
+a model is only saved (and loaded) when its cross-validated accuracy is good enough.
+
+    python -m src.components.utils.intentModel export
+    python -m src.components.utils.intentModel train
+"""
+import argparse
+import atexit
+import json
+import logging
+import math
+import os
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from src.components.utils.textFeatures import tokenize
+
+logger = logging.getLogger('IntentModel')
+
+INTENT_DECISION_LOG = os.getenv("INTENT_DECISION_LOG", os.path.join("data", "intent_decisions.jsonl"))
+INTENT_DECISION_LOGGING = os.getenv("INTENT_DECISION_LOGGING", "true").lower() == "true"
+# The log holds raw user messages: rotate it like the application logs
+INTENT_DECISION_LOG_MAX_BYTES = int(os.getenv("INTENT_DECISION_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+INTENT_DECISION_LOG_BACKUPS = int(os.getenv("INTENT_DECISION_LOG_BACKUPS", "3"))
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", os.path.join("data", "intent_model.json"))
+INTENT_TRAINING_PATH = os.path.join("data", "intent_training.jsonl")
+# Training needs at least this many samples of every label
+INTENT_MODEL_MIN_SAMPLES_PER_LABEL = int(os.getenv("INTENT_MODEL_MIN_SAMPLES_PER_LABEL", "5"))
+# Models below this cross-validated accuracy are neither saved nor loaded
+INTENT_MODEL_MIN_ACCURACY = float(os.getenv("INTENT_MODEL_MIN_ACCURACY", "0.8"))
+CROSS_VALIDATION_FOLDS = 5
+
+# Only decisions made by these tiers are used as training labels (never the local model's own guesses)
+TRAINING_TIERS = ("rules", "llm")
+
+
+def rotated_paths(path: str, backups: int = INTENT_DECISION_LOG_BACKUPS) -> List[str]:
+    """The log's existing files, oldest first (path.N ... path.1, path)"""
+    candidates = [f"{path}.{i}" for i in range(backups, 0, -1)] + [path]
+    return [candidate for candidate in candidates if os.path.exists(candidate)]
+
+
+class DecisionLog:
+    """
+    Buffered JSONL log of intent decisions; flushed every `flush_every` records and at exit.
+    Rotated at `max_bytes` keeping `backups` old files, like the application logs.
+    """
+
+    def __init__(self, path: str = INTENT_DECISION_LOG, flush_every: int = 20,
+                 max_bytes: int = INTENT_DECISION_LOG_MAX_BYTES, backups: int = INTENT_DECISION_LOG_BACKUPS):
+        self.path = path
+        self.flush_every = flush_every
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._buffer: List[str] = []
+        atexit.register(self.flush)
+
+    def record(self, message: str, intent: str, tier: str, confidence: float) -> None:
+        self._buffer.append(json.dumps({
+            "ts": time.time(), "message": message, "intent": intent, "tier": tier, "confidence": confidence
+        }))
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._rotate_if_full()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(self._buffer) + "\n")
+        except OSError as e:
+            logger.warning("⚠️ Could not write intent decision log: %s", e)
+        self._buffer.clear()
+
+    def _rotate_if_full(self) -> None:
+        if self.max_bytes <= 0 or not os.path.exists(self.path) or os.path.getsize(self.path) < self.max_bytes:
+            return
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+decision_log = DecisionLog()
+
+
+def log_intent_decision(message: str, decision: Dict) -> None:
+    if INTENT_DECISION_LOGGING:
+        decision_log.record(message, decision["intent"], decision["tier"], decision["confidence"])
+
+
+def export_training_pairs(log_path: str = INTENT_DECISION_LOG, out_path: str = INTENT_TRAINING_PATH,
+                          min_confidence: float = 0.8) -> int:
+    """
+    Exports deduplicated (message, intent) pairs from the decision log as JSONL.
+    Keeps rule and LLM decisions at or above min_confidence; the latest label wins.
+    Rotated log files are read too, oldest first.
+    """
+    decision_log.flush()
+    pairs: Dict[str, str] = {}
+    for path in rotated_paths(log_path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("tier") in TRAINING_TIERS and entry.get("confidence", 0) >= min_confidence:
+                    message = " ".join(entry["message"].split())
+                    if message:
+                        pairs[message.lower()] = (message, entry["intent"])
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        for message, intent in pairs.values():
+            f.write(json.dumps({"message": message, "intent": intent}) + "\n")
+
+    logger.info("📤 Exported %s training pairs to %s", len(pairs), out_path)
+    return len(pairs)
+
+
+def check_training_samples(samples: List[Tuple[str, str]], min_per_label: int = INTENT_MODEL_MIN_SAMPLES_PER_LABEL) -> None:
+    """Raises ValueError unless there are at least two labels with min_per_label samples each"""
+    counts = Counter(intent for _, intent in samples)
+    if len(counts) < 2:
+        raise ValueError(f"Need at least 2 intent labels to train, got {len(counts)}")
+    scarce = {intent: count for intent, count in counts.items() if count < min_per_label}
+    if scarce:
+        raise ValueError(f"Need at least {min_per_label} samples per label, too few for: {scarce}")
+
+
+def extract_features(text: str) -> List[str]:
+    """Word unigrams and bigrams (stop words kept: 'how do i' and 'who is' carry intent)"""
+    tokens = tokenize(text)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class TfidfLogisticIntentModel:
+    """
+    TF-IDF features with a multinomial logistic regression, trained with SGD.
+
+    Calling the model returns (intent, confidence), the signature expected by
+    intentClassifier.set_local_intent_model.
+    """
+
+    def __init__(self, labels: List[str], idf: Dict[str, float], weights: Dict[str, List[float]], bias: List[float],
+                 heldout_accuracy: Optional[float] = None):
+        self.labels = labels
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+        self.heldout_accuracy = heldout_accuracy  # cross-validated accuracy, recorded by the trainer
+
+    @staticmethod
+    def _vectorize(features: List[str], idf: Dict[str, float]) -> Dict[str, float]:
+        counts = Counter(f for f in features if f in idf)
+        vector = {f: (1 + math.log(c)) * idf[f] for f, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {f: v / norm for f, v in vector.items()}
+
+    @staticmethod
+    def _softmax(scores: List[float]) -> List[float]:
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    @classmethod
+    def fit(cls, samples: List[Tuple[str, str]], epochs: int = 30, learning_rate: float = 0.5,
+            l2: float = 1e-4, min_df: int = 1, seed: int = 13,
+            min_samples_per_label: int = INTENT_MODEL_MIN_SAMPLES_PER_LABEL) -> "TfidfLogisticIntentModel":
+        """Trains a model; raises ValueError if the samples fail check_training_samples"""
+        check_training_samples(samples, min_samples_per_label)
+        labels = sorted({intent for _, intent in samples})
+        documents = [extract_features(message) for message, _ in samples]
+
+        doc_freq = Counter(f for features in documents for f in set(features))
+        n_docs = len(documents)
+        idf = {f: math.log((1 + n_docs) / (1 + df)) + 1 for f, df in doc_freq.items() if df >= min_df}
+
+        model = cls(labels, idf, {}, [0.0] * len(labels))
+        vectors = [(cls._vectorize(features, idf), labels.index(intent))
+                   for features, (_, intent) in zip(documents, samples)]
+
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(vectors)
+            rate = learning_rate / (1 + epoch * 0.1)
+            for vector, target in vectors:
+                probs = model._probabilities(vector)
+                for k in range(len(labels)):
+                    gradient = probs[k] - (1.0 if k == target else 0.0)
+                    model.bias[k] -= rate * gradient
+                    for f, value in vector.items():
+                        row = model.weights.setdefault(f, [0.0] * len(labels))
+                        row[k] -= rate * (gradient * value + l2 * row[k])
+
+        return model
+
+    def _probabilities(self, vector: Dict[str, float]) -> List[float]:
+        scores = list(self.bias)
+        for f, value in vector.items():
+            row = self.weights.get(f)
+            if row:
+                for k, w in enumerate(row):
+                    scores[k] += w * value
+        return self._softmax(scores)
+
+    def predict_proba(self, message: str) -> Dict[str, float]:
+        probs = self._probabilities(self._vectorize(extract_features(message), self.idf))
+        return dict(zip(self.labels, probs))
+
+    def __call__(self, message: str) -> Tuple[str, float]:
+        probs = self._probabilities(self._vectorize(extract_features(message), self.idf))
+        best = max(range(len(probs)), key=probs.__getitem__)
+        return self.labels[best], probs[best]
+
+    def save(self, path: str = INTENT_MODEL_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "labels": self.labels,
+                "idf": self.idf,
+                "weights": {f: [round(w, 6) for w in row] for f, row in self.weights.items()},
+                "bias": self.bias,
+                "heldout_accuracy": self.heldout_accuracy,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str = INTENT_MODEL_PATH) -> "TfidfLogisticIntentModel":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["labels"], data["idf"], data["weights"], data["bias"], data.get("heldout_accuracy"))
+
+
+def cross_validate(samples: List[Tuple[str, str]], folds: int = CROSS_VALIDATION_FOLDS, seed: int = 13,
+                   min_samples_per_label: int = INTENT_MODEL_MIN_SAMPLES_PER_LABEL, **fit_kwargs) -> float:
+    """
+    Stratified k-fold accuracy: every sample is predicted by a model that never saw it.
+    Raises ValueError if the samples fail check_training_samples.
+    """
+    check_training_samples(samples, min_samples_per_label)
+    rng = random.Random(seed)
+    by_label: Dict[str, List[int]] = {}
+    for index, (_, intent) in enumerate(samples):
+        by_label.setdefault(intent, []).append(index)
+
+    fold_of = [0] * len(samples)
+    for indices in by_label.values():
+        rng.shuffle(indices)
+        for position, index in enumerate(indices):
+            fold_of[index] = position % folds
+
+    correct = evaluated = 0
+    for fold in range(folds):
+        train = [sample for sample, f in zip(samples, fold_of) if f != fold]
+        test = [sample for sample, f in zip(samples, fold_of) if f == fold]
+        if not test:
+            continue
+        model = TfidfLogisticIntentModel.fit(train, seed=seed, min_samples_per_label=1, **fit_kwargs)
+        correct += sum(model(message)[0] == intent for message, intent in test)
+        evaluated += len(test)
+    return correct / evaluated
+
+
+def load_training_pairs(paths: List[str]) -> List[Tuple[str, str]]:
+    samples = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    samples.append((entry["message"], entry["intent"]))
+    return samples
+
+
+def load_local_intent_model(path: str = INTENT_MODEL_PATH) -> Optional[TfidfLogisticIntentModel]:
+    """Loads the trained model if one exists and passed the accuracy gate; returns None otherwise"""
+    if not os.path.exists(path):
+        logger.info("ℹ️ No local intent model at %s; using rules and the LLM only", path)
+        return None
+    try:
+        model = TfidfLogisticIntentModel.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("⚠️ Could not load local intent model from %s: %s", path, e)
+        return None
+    if len(model.labels) < 2 or model.heldout_accuracy is None or model.heldout_accuracy < INTENT_MODEL_MIN_ACCURACY:
+        logger.warning("⚠️ Ignoring local intent model at %s: %s labels, held-out accuracy %s (need %s)",
+                       path, len(model.labels), model.heldout_accuracy, INTENT_MODEL_MIN_ACCURACY)
+        return None
+    logger.info("🧠 Loaded local intent model (%s features, held-out accuracy %.1f%%, labels: %s)",
+                len(model.weights), model.heldout_accuracy * 100, ', '.join(model.labels))
+    return model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export logged intent decisions and train the local intent model")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export (message, intent) pairs from the decision log")
+    export_parser.add_argument("--log", default=INTENT_DECISION_LOG)
+    export_parser.add_argument("--out", default=INTENT_TRAINING_PATH)
+    export_parser.add_argument("--min-confidence", type=float, default=0.8)
+
+    train_parser = subparsers.add_parser("train", help="Train the model on exported pairs")
+    train_parser.add_argument("--data", nargs="+", default=[INTENT_TRAINING_PATH], help="JSONL files of {message, intent}")
+    train_parser.add_argument("--out", default=INTENT_MODEL_PATH)
+    train_parser.add_argument("--epochs", type=int, default=30)
+    train_parser.add_argument("--folds", type=int, default=CROSS_VALIDATION_FOLDS)
+    train_parser.add_argument("--min-accuracy", type=float, default=INTENT_MODEL_MIN_ACCURACY,
+                              help="Only save the model if its cross-validated accuracy reaches this")
+
+    args = parser.parse_args()
+    if args.command == "export":
+        count = export_training_pairs(args.log, args.out, args.min_confidence)
+        print(f"Exported {count} pairs to {args.out}")
+        return
+
+    samples = load_training_pairs(args.data)
+    start = time.perf_counter()
+    try:
+        accuracy = cross_validate(samples, folds=args.folds, epochs=args.epochs)
+    except ValueError as e:
+        parser.exit(1, f"Not training: {e}\n")
+    if accuracy < args.min_accuracy:
+        parser.exit(1, f"Not saving: cross-validated accuracy {accuracy:.1%} is below {args.min_accuracy:.1%}\n")
+
+    model = TfidfLogisticIntentModel.fit(samples, epochs=args.epochs)
+    model.heldout_accuracy = accuracy
+    model.save(args.out)
+    print(f"Trained on {len(samples)} pairs in {time.perf_counter() - start:.1f}s "
+          f"({args.folds}-fold accuracy {accuracy:.1%}), saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Dependency-free first intent tier: keyword/regex rules plus mention analysis"""
+import re
+from typing import Any, Dict, Optional
+
+INTENT_LABELS = ["user_wants_help", "server_info", "user_info", "general"]
+
+# Rule decisions below this confidence fall through to the next tier
+RULE_CONFIDENCE_THRESHOLD = 0.8
+
+# TIER 1: deterministic rules (mirrors the keywords and tagging rules in the LLM prompt)
+HELP_PATTERN = re.compile(
+    r"(\bhelp:|\bhelp me\b|\bhow do i\b|\bcan you help\b|\bi'?m stuck\b|\bi am stuck\b|"
+    r"\bproblem with\b|\bneed (some )?(assistance|help)\b)",
+    re.IGNORECASE
+)
+SMALL_TALK_PATTERN = re.compile(
+    r"^(hi+|hey+|hello+|yo+|sup|heya|hiya|thanks?|thank you|thx|ty|tysm|gm|gn|good (morning|night|evening|afternoon)|"
+    r"lol|lmao|haha+|ok(ay)?|nice|cool|bye|cya|welcome|gg|wow|love (you|it)|you'?re (awesome|the best))"
+    r"( (everyone|all|guys|bro|man|buddy|bot|so much|a lot))?[\s!.?]*$",
+    re.IGNORECASE
+)
+SERVER_INFO_PATTERN = re.compile(
+    r"\b(server rules?|what are the rules|how many (members|people|users|channels|roles)|member count|"
+    r"who (are|is) the (mods?|moderators?|admins?|staff|owners?|founders?)|what channels|which channels|"
+    r"(about|info on|information about|tell me about) (this|the) server|when was (this|the) server (made|created))\b",
+    re.IGNORECASE
+)
+USER_INFO_PATTERN = re.compile(
+    r"\b(when did \S+ join|what'?s (his|her|their) |what is (his|her|their) |(role|roles|timezone|status|activity) of\b|"
+    r"what (role|roles|activity) (is|does|do)|is \S+ (online|a mod|an admin|the owner))",
+    re.IGNORECASE
+)
+
+LEADING_MENTIONS_PATTERN = re.compile(r"^(@\S+\s*)+")
+
+
+def parse_intent_label(answer: Optional[str]) -> Optional[str]:
+    """Normalises an LLM answer to one of INTENT_LABELS, or None if it isn't one"""
+    intent = (answer or "").strip().strip("`'\".").lower()
+    return intent if intent in INTENT_LABELS else None
+
+
+def classify_intent_by_rules(message: str, mention_count: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    Deterministic first tier: compiled keyword/regex rules plus mention analysis.
+
+    Args:
+        message: Cleaned user message (bot mention removed)
+        mention_count: Number of users mentioned other than the bot
+
+    Returns:
+        Decision dict (intent, confidence, tier) or None when the rules can't decide
+    """
+    text = message.strip()
+    if not text:
+        return {"intent": "general", "confidence": 1.0, "tier": "rules"}
+
+    if HELP_PATTERN.search(text):
+        return {"intent": "user_wants_help", "confidence": 0.95, "tier": "rules"}
+
+    # '@user thanks' is addressed to someone, not asking about them
+    if SMALL_TALK_PATTERN.match(LEADING_MENTIONS_PATTERN.sub("", text)):
+        return {"intent": "general", "confidence": 0.95, "tier": "rules"}
+
+    # Asking ABOUT someone needs someone to be mentioned; otherwise it's a server question
+    if mention_count > 0 and USER_INFO_PATTERN.search(text):
+        return {"intent": "user_info", "confidence": 0.85, "tier": "rules"}
+
+    if mention_count == 0 and SERVER_INFO_PATTERN.search(text):
+        return {"intent": "server_info", "confidence": 0.85, "tier": "rules"}
+
+    return None
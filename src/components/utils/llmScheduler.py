@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from src.components.utils.metrics import GaugeCallback, registry
+
+logger = logging.getLogger('LLMScheduler')
+
+# Priority classes, most urgent first
+PRIORITY_INTERACTIVE = 0      # replies and intent classification a user is waiting on
+PRIORITY_CLASSIFICATION = 1   # help-search channel classification and ranking
+PRIORITY_BACKGROUND = 2       # ingestion, profiling, warm-up
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+# Default per-backend request limit (Groq on-demand: 30 requests/minute per model)
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+# Per-backend overrides, e.g. "groq:llama-3.1-8b-instant=30,mistral:mistral-small-latest=60"
+LLM_BACKEND_RATE_LIMITS = os.getenv("LLM_BACKEND_RATE_LIMITS", "")
+LLM_BURST = int(os.getenv("LLM_BURST", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for provider 429 / rate-limit errors (groq, openai and agno wrappers)"""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    text = str(error).lower()
+    return "429" in text or "rate limit" in text or "rate_limit" in text
+
+
+def parse_rate_limits(spec: str) -> Dict[str, float]:
+    """Parses "backend=rpm,backend=rpm" into a dict (backend specs contain ':' but never '=' or ',')"""
+    limits = {}
+    for item in spec.split(","):
+        backend, sep, rpm = item.rpartition("=")
+        if sep and backend.strip():
+            try:
+                limits[backend.strip()] = float(rpm)
+            except ValueError:
+                logger.warning("⚠️ Ignoring invalid rate limit '%s'", item)
+    return limits
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, up to `capacity` stored"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Takes a token if one is available; returns 0, or the seconds until the next token"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    async def acquire(self) -> None:
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class _Job:
+    __slots__ = ("call", "priority", "guild_id", "backend", "future", "task", "started")
+
+    def __init__(self, call: Callable[[], Awaitable[Any]], priority: int, guild_id: Optional[int],
+                 backend: Optional[str], future: asyncio.Future):
+        self.call = call
+        self.priority = priority
+        self.guild_id = guild_id
+        self.backend = backend
+        self.future = future
+        self.task: Optional[asyncio.Task] = None
+        self.started = False
+
+
+class LLMScheduler:
+    """
+    Central scheduler for every LLM call.
+
+    Calls are queued per priority class and, within a class, per guild; guilds are
+    served round-robin so one busy guild cannot starve the others. Each backend
+    ('provider:model_id') has its own token bucket matched to its request limit, and
+    a job whose backend is out of tokens does not hold up jobs for other backends.
+    A concurrency cap bounds calls in flight, and 429s are retried with jittered
+    exponential backoff.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                 burst: int = LLM_BURST, max_retries: int = LLM_MAX_RETRIES, backoff_base: float = LLM_BACKOFF_BASE,
+                 rate_limits: Optional[Dict[str, float]] = None):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.rate_limits = rate_limits or {}
+        self._buckets: Dict[Optional[str], TokenBucket] = {}
+        # priority -> guild_id -> pending jobs
+        self._queues: Dict[int, "OrderedDict[Optional[int], Deque[_Job]]"] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'rate_limited': 0, 'retries': 0}
+
+    def bucket_for(self, backend: Optional[str]) -> TokenBucket:
+        bucket = self._buckets.get(backend)
+        if bucket is None:
+            rpm = self.rate_limits.get(backend, self.requests_per_minute)
+            bucket = self._buckets[backend] = TokenBucket(rpm / 60.0, self.burst)
+        return bucket
+
+    async def submit(self, call: Callable[[], Awaitable[Any]], priority: int = PRIORITY_INTERACTIVE,
+                     guild_id: Optional[int] = None, backend: Optional[str] = None) -> Any:
+        """
+        Queue an LLM call and wait for its result.
+
+        Args:
+            call: Zero-argument function returning the awaitable to run (called again on retry)
+            priority: One of the PRIORITY_* classes
+            guild_id: Guild the call is made for, used for fairness
+            backend: Backend spec the call goes to, selecting its rate limit
+        """
+        self._ensure_dispatcher()
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(call, priority, guild_id, backend, future)
+        # If the caller gives up (e.g. a cancelled speculative reply), stop the running call too
+        future.add_done_callback(lambda f: job.task.cancel() if f.cancelled() and job.task else None)
+
+        self._queues.setdefault(priority, OrderedDict()).setdefault(guild_id, deque()).append(job)
+        self.stats['submitted'] += 1
+        self._pending.set()
+        return await future
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._pending = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _next_job(self) -> Tuple[Optional[_Job], Optional[float]]:
+        """
+        Pops the most urgent job whose backend has a rate-limit token (taking the token).
+        Returns (job, None), or (None, seconds until a token frees up) when every queued
+        job is rate limited, or (None, None) when nothing is queued.
+        """
+        wait: Optional[float] = None
+        for priority in sorted(self._queues):
+            guilds = self._queues[priority]
+            for guild_id in list(guilds):
+                jobs = guilds[guild_id]
+                for job in list(jobs):
+                    if job.future.done():
+                        jobs.remove(job)  # cancelled while queued
+                        continue
+                    retry_in = self.bucket_for(job.backend).try_acquire()
+                    if retry_in:
+                        wait = retry_in if wait is None else min(wait, retry_in)
+                        continue
+                    jobs.remove(job)
+                    if jobs:
+                        guilds.move_to_end(guild_id)  # round-robin across guilds
+                    else:
+                        del guilds[guild_id]
+                    return job, None
+                if not jobs:
+                    del guilds[guild_id]
+        return None, wait
+
+    async def _dispatch(self) -> None:
+        while True:
+            await self._pending.wait()
+            # Nothing below awaits between picking a job and starting it, so a caller cannot
+            # cancel a job after it was picked but before its task exists
+            await self._slots.acquire()
+            job, wait = self._next_job()
+            if job is None:
+                self._slots.release()
+                self._pending.clear()
+                if wait is not None:
+                    # Every queued job is rate limited: sleep until a token frees up or a new job arrives
+                    try:
+                        await asyncio.wait_for(self._pending.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        self._pending.set()
+                continue
+            job.task = asyncio.create_task(self._run(job))
+            job.task.add_done_callback(lambda task, job=job: self._finish(job, task))
+
+    def _finish(self, job: _Job, task: asyncio.Task) -> None:
+        # Released here rather than in _run: a task cancelled before it starts never runs its finally
+        self._slots.release()
+        if task.cancelled() and not job.started:
+            self.bucket_for(job.backend).refund()
+
+    async def _run(self, job: _Job) -> None:
+        job.started = True
+        if job.future.done():
+            self.bucket_for(job.backend).refund()
+            return
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    result = await job.call()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    if is_rate_limit_error(e) and attempt < self.max_retries:
+                        self.stats['rate_limited'] += 1
+                        self.stats['retries'] += 1
+                        delay = self.backoff_base * (2 ** attempt) * random.uniform(0.5, 1.5)
+                        logger.warning("⏳ LLM rate limited (attempt %s), retrying in %.1fs", attempt + 1, delay)
+                        await asyncio.sleep(delay)
+                        await self.bucket_for(job.backend).acquire()
+                        continue
+                    self.stats['failed'] += 1
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                    return
+                self.stats['completed'] += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+                return
+        except asyncio.CancelledError:
+            if not job.future.done():
+                job.future.cancel()
+
+    def queued(self) -> int:
+        return sum(len(jobs) for guilds in self._queues.values() for jobs in guilds.values())
+
+
+# Shared, process-wide LLM scheduler
+llm_scheduler = LLMScheduler(rate_limits=parse_rate_limits(LLM_BACKEND_RATE_LIMITS))
+
+registry.register(GaugeCallback("ralsai_llm_queued_requests", "LLM requests waiting in the scheduler", llm_scheduler.queued))
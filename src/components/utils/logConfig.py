@@ -0,0 +1,126 @@
+"""
+Process-wide logging setup.
+
+Log calls only enqueue records (QueueHandler); a background QueueListener thread
+formats them and does the console/file I/O, so logging never blocks the event loop.
+
+Environment:
+    LOG_LEVEL   root level (default INFO)
+    LOG_LEVELS  per-logger levels, e.g. "HelpResolver=DEBUG,LLMScheduler=WARNING,httpx=WARNING"
+    LOG_FORMAT  "text" (default) or "json" (one JSON object per line)
+    LOG_DIR     directory for running_logs.log / error_logs.log; empty disables file logging
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+# Chatty third-party loggers, quieted unless LOG_LEVELS says otherwise
+DEFAULT_LOGGER_LEVELS = {"httpx": "WARNING", "httpcore": "WARNING", "discord": "INFO", "uvicorn.access": "WARNING"}
+
+TEXT_FORMAT = '%(asctime)s - p%(process)s - {%(pathname)s:%(lineno)d} - %(name)s - %(levelname)s - %(message)s'
+
+# Standard LogRecord attributes; anything else on a record came from `extra=` and is emitted as a field
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any `extra=` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records unformatted: the stock QueueHandler renders the message in the
+    calling thread, which is exactly the work we want off the event loop. Records
+    stay in-process, so args and exc_info can be kept as they are (don't mutate
+    objects right after logging them).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_logger_levels(spec: str) -> Dict[str, str]:
+    """Parses "name=LEVEL,name=LEVEL" into a dict"""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> None:
+    """Installs the queue-based handlers on the root logger (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    console_handler = logging.StreamHandler(sys.stdout)
+    handlers = [console_handler]
+
+    if LOG_DIR:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        running_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(LOG_DIR, "running_logs.log"), maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUPS, encoding="utf-8"
+        )
+        error_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(LOG_DIR, "error_logs.log"), maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUPS, encoding="utf-8"
+        )
+        error_handler.setLevel(logging.ERROR)
+        handlers += [running_handler, error_handler]
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+
+    for name, level in {**DEFAULT_LOGGER_LEVELS, **parse_logger_levels(LOG_LEVELS)}.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -0,0 +1,278 @@
+import asyncio
+import atexit
+import logging
+import os
+import sqlite3
+from typing import Iterable, List, Optional, Set, Tuple
+import discord
+from src.components.utils.channelPermissions import channel_permissions
+
+logger = logging.getLogger('MessageIndex')
+
+MESSAGE_INDEX_PATH = os.getenv("MESSAGE_INDEX_PATH", os.path.join("data", "message_index.db"))
+# Live writes are committed (and their channels pruned) in one batch this many seconds after the first one
+MESSAGE_INDEX_COMMIT_DELAY = float(os.getenv("MESSAGE_INDEX_COMMIT_DELAY", "2"))
+
+
+def extract_message_content(message: discord.Message) -> str:
+    """Combine a message's text and embed content into a single string"""
+    text_content = message.content.strip()
+
+    embed_content = ""
+    for embed in message.embeds:
+        title = embed.title or ""
+        desc = embed.description or ""
+        fields = "\n".join(f"{f.name}: {f.value}" for f in embed.fields)
+        embed_content += f"{title}\n{desc}\n{fields}\n"
+
+    return (text_content + "\n" + embed_content).strip()
+
+
+def extract_payload_content(data: dict) -> str:
+    """Same as extract_message_content, for the raw message payload of a gateway event"""
+    text_content = (data.get("content") or "").strip()
+
+    embed_content = ""
+    for embed in data.get("embeds") or []:
+        title = embed.get("title") or ""
+        desc = embed.get("description") or ""
+        fields = "\n".join(f"{f.get('name', '')}: {f.get('value', '')}" for f in embed.get("fields") or [])
+        embed_content += f"{title}\n{desc}\n{fields}\n"
+
+    return (text_content + "\n" + embed_content).strip()
+
+
+class MessageIndex:
+    """
+    Incremental, per-guild local store of channel messages backed by SQLite.
+
+    Kept current by the gateway events (new messages, and the raw edit/delete events,
+    which also cover messages outside discord.py's message cache) and backfilled
+    on startup from the last completed backfill, so help searches read from disk
+    instead of paging through channel.history.
+
+    Live writes are not committed one by one: they are batched and committed off
+    a short timer, which also prunes the channels that received new messages.
+    """
+
+    def __init__(self, path: str = MESSAGE_INDEX_PATH, max_messages_per_channel: int = 500):
+        self.path = path
+        self.max_messages_per_channel = max_messages_per_channel
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS messages (
+                message_id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                author_id INTEGER NOT NULL,
+                author_name TEXT NOT NULL,
+                content TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_channel ON messages (channel_id, message_id DESC);
+            CREATE TABLE IF NOT EXISTS channel_state (
+                channel_id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                high_water INTEGER,
+                backfilled INTEGER NOT NULL DEFAULT 0,
+                backfilled_through INTEGER
+            );
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(channel_state)")}
+        if "backfilled_through" not in columns:
+            # Older stores: re-backfill every channel once, newest first
+            self.conn.execute("ALTER TABLE channel_state ADD COLUMN backfilled_through INTEGER")
+            self.conn.execute("UPDATE channel_state SET backfilled = 0")
+        self.conn.commit()
+        self._dirty_channels: Set[int] = set()
+        self._commit_pending = False
+        atexit.register(self.flush)
+
+    # ---- batched commits ----
+
+    def _schedule_commit(self, channel_id: Optional[int] = None) -> None:
+        if channel_id is not None:
+            self._dirty_channels.add(channel_id)
+        if self._commit_pending:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._commit_pending = True
+        loop.call_later(MESSAGE_INDEX_COMMIT_DELAY, self.flush)
+
+    def flush(self) -> None:
+        """Prune the channels written since the last flush and commit"""
+        self._commit_pending = False
+        dirty, self._dirty_channels = self._dirty_channels, set()
+        try:
+            for channel_id in dirty:
+                self._prune_channel(channel_id)
+            self.conn.commit()
+        except Exception as e:
+            logger.error("❌ Error committing message index: %s", e)
+
+    # ---- gateway event ingestion ----
+
+    def add_message(self, message: discord.Message) -> None:
+        """Store a new (or re-store an edited) guild message"""
+        if message.guild is None:
+            return
+        content = extract_message_content(message)
+        if not content:
+            return
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO messages (message_id, guild_id, channel_id, author_id, author_name, content) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (message.id, message.guild.id, message.channel.id, message.author.id, message.author.display_name, content)
+            )
+            self._advance_high_water(message.guild.id, message.channel.id, message.id)
+            self._schedule_commit(message.channel.id)
+        except Exception as e:
+            logger.error("❌ Error indexing message %s: %s", message.id, e)
+
+    def update_from_payload(self, message_id: int, data: dict) -> None:
+        """
+        Apply a raw message edit. Only messages already in the index are updated;
+        messages edited down to nothing are removed. Payloads without content or
+        embeds (e.g. pin or flag changes) are ignored.
+        """
+        if "content" not in data and "embeds" not in data:
+            return
+        content = extract_payload_content(data)
+        if not content:
+            self.delete_messages([message_id])
+            return
+        try:
+            self.conn.execute("UPDATE messages SET content = ? WHERE message_id = ?", (content, message_id))
+            self._schedule_commit()
+        except Exception as e:
+            logger.error("❌ Error updating message %s in index: %s", message_id, e)
+
+    def delete_messages(self, message_ids: Iterable[int]) -> None:
+        try:
+            self.conn.executemany("DELETE FROM messages WHERE message_id = ?", [(message_id,) for message_id in message_ids])
+            self._schedule_commit()
+        except Exception as e:
+            logger.error("❌ Error removing messages from index: %s", e)
+
+    def purge_channel(self, channel_id: int) -> None:
+        """Drop everything stored for a deleted channel"""
+        try:
+            self.conn.execute("DELETE FROM messages WHERE channel_id = ?", (channel_id,))
+            self.conn.execute("DELETE FROM channel_state WHERE channel_id = ?", (channel_id,))
+            self._dirty_channels.discard(channel_id)
+            self._schedule_commit()
+        except Exception as e:
+            logger.error("❌ Error purging channel %s from index: %s", channel_id, e)
+
+    def _advance_high_water(self, guild_id: int, channel_id: int, message_id: int) -> None:
+        self.conn.execute(
+            "INSERT INTO channel_state (channel_id, guild_id, high_water) VALUES (?, ?, ?) "
+            "ON CONFLICT(channel_id) DO UPDATE SET high_water = MAX(COALESCE(high_water, 0), excluded.high_water)",
+            (channel_id, guild_id, message_id)
+        )
+
+    # ---- backfill ----
+
+    def get_high_water(self, channel_id: int) -> Optional[int]:
+        """Newest message id seen for a channel (live or backfilled)"""
+        row = self.conn.execute("SELECT high_water FROM channel_state WHERE channel_id = ?", (channel_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_backfilled_through(self, channel_id: int) -> Optional[int]:
+        """Newest message id up to which the channel's history is known to be complete (only backfill advances it)"""
+        row = self.conn.execute(
+            "SELECT backfilled_through FROM channel_state WHERE channel_id = ? AND backfilled = 1", (channel_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_backfilled(self, channel_id: int) -> bool:
+        row = self.conn.execute("SELECT backfilled FROM channel_state WHERE channel_id = ?", (channel_id,)).fetchone()
+        return bool(row and row[0])
+
+    async def backfill_channel(self, channel: discord.TextChannel) -> int:
+        """
+        Fetch the messages posted since the last completed backfill, newest first.
+
+        Live messages advance the high-water mark but not the backfilled-through mark,
+        so messages posted while the bot was down are still fetched. The gap is read
+        newest to oldest, so a gap longer than max_messages_per_channel keeps the most
+        recent messages. Rows are written in one synchronous step after the fetch, so
+        a failed fetch writes nothing and leaves pending live writes untouched.
+        """
+        through = self.get_backfilled_through(channel.id)
+        after = discord.Object(id=through) if through else None
+        rows = []
+        newest_id = through
+        try:
+            async for message in channel.history(limit=self.max_messages_per_channel, after=after, oldest_first=False):
+                newest_id = max(newest_id or 0, message.id)
+                content = extract_message_content(message)
+                if content:
+                    rows.append(
+                        (message.id, channel.guild.id, channel.id, message.author.id, message.author.display_name, content)
+                    )
+        except Exception as e:
+            logger.error("❌ Error backfilling #%s: %s", channel.name, e)
+            return 0
+
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO messages (message_id, guild_id, channel_id, author_id, author_name, content) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            if newest_id:
+                self._advance_high_water(channel.guild.id, channel.id, newest_id)
+            # The gap is closed: mark the channel backfilled through the newest fetched message
+            self.conn.execute(
+                "INSERT INTO channel_state (channel_id, guild_id, backfilled, backfilled_through) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET backfilled = 1, "
+                "backfilled_through = MAX(COALESCE(backfilled_through, 0), COALESCE(excluded.backfilled_through, 0))",
+                (channel.id, channel.guild.id, newest_id)
+            )
+            self._schedule_commit(channel.id)
+            logger.debug("📥 Backfilled %s messages from #%s", len(rows), channel.name)
+        except Exception as e:
+            logger.error("❌ Error storing backfill of #%s: %s", channel.name, e)
+        return len(rows)
+
+    async def backfill_guild(self, guild: discord.Guild) -> None:
+        """Backfill every readable text channel of a guild, one channel at a time"""
+        total = 0
+        for channel in channel_permissions.filter_readable(guild, guild.text_channels):
+            total += await self.backfill_channel(channel)
+        logger.info("📥 Message index backfill for '%s' complete: %s new messages", guild.name, total)
+
+    def _prune_channel(self, channel_id: int) -> None:
+        """Keep only the newest max_messages_per_channel messages of a channel"""
+        self.conn.execute(
+            "DELETE FROM messages WHERE channel_id = ? AND message_id NOT IN "
+            "(SELECT message_id FROM messages WHERE channel_id = ? ORDER BY message_id DESC LIMIT ?)",
+            (channel_id, channel_id, self.max_messages_per_channel)
+        )
+
+    # ---- queries ----
+
+    def get_channel_messages(self, channel: discord.TextChannel, limit: int = 100,
+                             exclude_author_id: Optional[int] = None) -> List[Tuple[str, str, str]]:
+        """Newest-first (channel_name, author, content) tuples for a channel"""
+        rows = self.conn.execute(
+            "SELECT author_name, content FROM messages WHERE channel_id = ? AND author_id != ? "
+            "ORDER BY message_id DESC LIMIT ?",
+            (channel.id, exclude_author_id or 0, limit)
+        ).fetchall()
+        return [(channel.name, author, content) for author, content in rows]
+
+
+# Shared, process-wide message index
+message_index = MessageIndex()
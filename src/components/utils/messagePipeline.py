@@ -0,0 +1,68 @@
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+import discord
+from src.components.utils.metrics import PIPELINE_STAGE_EVENTS
+
+logger = logging.getLogger('MessagePipeline')
+
+Gate = Callable[[discord.Message], bool]
+Handler = Callable[[discord.Message], Awaitable[bool]]
+
+
+class Stage:
+    """
+    One step of message dispatch.
+
+    Args:
+        name: Stage name (used in stats)
+        handler: Async handler; returns True when the message is fully handled and dispatch should stop
+        gate: Cheap synchronous pre-check; the handler only runs when it returns True
+    """
+
+    def __init__(self, name: str, handler: Handler, gate: Optional[Gate] = None):
+        self.name = name
+        self.handler = handler
+        self.gate = gate
+        self.stats = {'seen': 0, 'passed_gate': 0, 'handled': 0, 'errors': 0}
+
+    def count(self, event: str) -> None:
+        """Bumps a hit counter, both locally and in the exported metrics"""
+        self.stats[event] += 1
+        PIPELINE_STAGE_EVENTS.inc(stage=self.name, event=event)
+
+
+class MessagePipeline:
+    """
+    Ordered on_message dispatch: every stage runs its cheap gate first, so
+    expensive handlers (regexes, LLM calls) only see messages that can match.
+    Each stage keeps its own hit counters, also exported on /metrics.
+    """
+
+    def __init__(self):
+        self.stages: List[Stage] = []
+
+    def add_stage(self, name: str, handler: Handler, gate: Optional[Gate] = None) -> None:
+        self.stages.append(Stage(name, handler, gate))
+
+    async def dispatch(self, message: discord.Message) -> Optional[str]:
+        """Runs the message through the stages; returns the name of the stage that handled it, if any"""
+        for stage in self.stages:
+            stage.count('seen')
+            if stage.gate is not None and not stage.gate(message):
+                continue
+            stage.count('passed_gate')
+
+            try:
+                handled = await stage.handler(message)
+            except Exception:
+                stage.count('errors')
+                logger.exception("❌ Message stage '%s' failed", stage.name)
+                return None
+
+            if handled:
+                stage.count('handled')
+                return stage.name
+        return None
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {stage.name: dict(stage.stats) for stage in self.stages}
@@ -0,0 +1,89 @@
+import logging
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+from src.components.utils.textFeatures import tokenize, STOP_WORDS
+from src.components.utils.promptBudget import count_tokens
+
+logger = logging.getLogger('PassageRanker')
+
+
+def _index_terms(text: str) -> List[str]:
+    return [token for token in tokenize(text) if token not in STOP_WORDS]
+
+
+class BM25Index:
+    """
+    Small in-memory inverted index with Okapi BM25 scoring.
+
+    Args:
+        documents: Texts to index; document ids are their list positions
+        k1: Term-frequency saturation
+        b: Document-length normalisation
+    """
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_count = len(documents)
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)  # term -> [(doc_id, term_frequency)]
+
+        for doc_id, document in enumerate(documents):
+            terms = _index_terms(document)
+            self.doc_lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                self.postings[term].append((doc_id, frequency))
+
+        self.avg_doc_length = (sum(self.doc_lengths) / self.doc_count) if self.doc_count else 0.0
+
+    def _idf(self, term: str) -> float:
+        doc_frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (self.doc_count - doc_frequency + 0.5) / (doc_frequency + 0.5))
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """Returns (doc_id, score) for every document matching at least one query term, best first"""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(_index_terms(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for doc_id, frequency in postings:
+                length_norm = 1 - self.b + self.b * (self.doc_lengths[doc_id] / (self.avg_doc_length or 1))
+                scores[doc_id] += idf * (frequency * (self.k1 + 1)) / (frequency + self.k1 * length_norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def rank_passages(query: str, messages: List[Tuple[str, str, str]], top_k: int = 30,
+                  token_budget: int = 2000) -> List[Tuple[str, str, str]]:
+    """
+    Ranks collected (channel, author, content) messages against the query with BM25
+    and keeps the best top_k passages that fit in the token budget.
+
+    If no message shares a term with the query, falls back to collection order.
+    """
+    if not messages:
+        return []
+
+    index = BM25Index([f"{channel} {content}" for channel, _, content in messages])
+    ranked_ids = [doc_id for doc_id, _ in index.search(query)]
+    if not ranked_ids:
+        logger.debug("🔎 No BM25 matches, falling back to collection order")
+        ranked_ids = list(range(len(messages)))
+
+    selected = []
+    used_tokens = 0
+    for doc_id in ranked_ids:
+        channel, author, content = messages[doc_id]
+        cost = count_tokens(f"[#{channel}] {author}: {content}")
+        if used_tokens + cost > token_budget:
+            continue
+        selected.append(messages[doc_id])
+        used_tokens += cost
+        if len(selected) >= top_k:
+            break
+
+    logger.info("🔎 Ranked %s messages → %s passages (~%s tokens)", len(messages), len(selected), used_tokens)
+    return selected
@@ -1,7 +1,11 @@
 # personalityManager.py
 
+import logging
 from collections import defaultdict
 from typing import Dict, Optional
+from src.components.utils.promptBudget import PROMPT_TOKEN_LIMIT, count_tokens, truncate_to_tokens
+
+logger = logging.getLogger('PersonalityManager')
 
 server_personality = defaultdict(lambda: "normal")  # Default to "normal"
 
@@ -28,16 +32,28 @@ def set_personality(server_id: int, personality: str) -> bool:
     
     if personality in VALID_PERSONALITIES:
         server_personality[server_id] = personality
-        print(f"Set personality '{personality}' for server {server_id}")
+        logger.info("Set personality '%s' for server %s", personality, server_id)
         return True
     else:
-        print(f"Invalid personality '{personality}' for server {server_id}")
+        logger.info("Invalid personality '%s' for server %s", personality, server_id)
         return False
 
 def get_personality(server_id: int) -> str:
     return server_personality[server_id]
 
-def format_with_personality(prompt: str, personality: str, context: Optional[str] = None) -> str:
+PERSONALITY_PROMPT_BUILDERS = {
+    "normal": lambda context, prompt: _get_normal_prompt(context, prompt),
+    "friendly": lambda context, prompt: _get_friendly_prompt(context, prompt),
+    "sarcastic": lambda context, prompt: _get_sarcastic_prompt(context, prompt),
+    "dark_humor": lambda context, prompt: _get_dark_humor_prompt(context, prompt),
+    "dark_sarcastic": lambda context, prompt: _get_dark_sarcastic_prompt(context, prompt),
+    "flirty": lambda context, prompt: _get_flirty_prompt(context, prompt),
+    "professional": lambda context, prompt: _get_professional_prompt(context, prompt),
+    "casual": lambda context, prompt: _get_casual_prompt(context, prompt)
+}
+
+def format_with_personality(prompt: str, personality: str, context: Optional[str] = None,
+                            token_limit: int = PROMPT_TOKEN_LIMIT) -> str:
     """
     Formats prompt with personality-specific instructions.
     
@@ -45,6 +61,8 @@ def format_with_personality(prompt: str, personality: str, context: Optional[str
         prompt: User's original message
         personality: Personality type to apply
         context: Optional additional context (e.g., "Discord moderator")
+        token_limit: Total token budget; the wrapped prompt is trimmed to fit
+            next to the personality guidance
     
     Returns:
         Enhanced prompt with personality instructions
@@ -55,18 +73,32 @@ def format_with_personality(prompt: str, personality: str, context: Optional[str
     base_context = context if context else "You are a helpful AI assistant"
     
     # Enhanced personality prompts with clear behavioral guidelines
-    personality_prompts = {
-        "normal": _get_normal_prompt(base_context, prompt),
-        "friendly": _get_friendly_prompt(base_context, prompt),
-        "sarcastic": _get_sarcastic_prompt(base_context, prompt),
-        "dark_humor": _get_dark_humor_prompt(base_context, prompt),
-        "dark_sarcastic": _get_dark_sarcastic_prompt(base_context, prompt),
-        "flirty": _get_flirty_prompt(base_context, prompt),
-        "professional": _get_professional_prompt(base_context, prompt),
-        "casual": _get_casual_prompt(base_context, prompt)
-    }
+    builder = PERSONALITY_PROMPT_BUILDERS.get(personality, PERSONALITY_PROMPT_BUILDERS["normal"])
+    
+    # Personality guidance has priority; the request gets what is left of the budget
+    guidance_tokens = count_tokens(builder(base_context, ""))
+    prompt = truncate_to_tokens(prompt, token_limit - guidance_tokens)
+    
+    return builder(base_context, prompt)
+
+def get_personality_instructions(personality: str, context: Optional[str] = None) -> str:
+    """
+    Returns only the personality guidance (no user request), for use as part of
+    an agent's system prompt so it is not re-sent with every message.
+    
+    Args:
+        personality: Personality type to apply
+        context: Optional additional context (e.g., "Discord moderator")
+    
+    Returns:
+        Personality instructions
+    """
+    personality = personality.lower().replace(" ", "_")
+    base_context = context if context else "You are a helpful AI assistant"
+    builder = PERSONALITY_PROMPT_BUILDERS.get(personality, PERSONALITY_PROMPT_BUILDERS["normal"])
     
-    return personality_prompts.get(personality, personality_prompts["normal"])
+    # Every template ends with the "USER REQUEST:" slot; drop it
+    return builder(base_context, "").rsplit("USER REQUEST:", 1)[0].strip()
 
 def _get_normal_prompt(context: str, prompt: str) -> str:
     """Standard helpful assistant personality."""
@@ -249,10 +281,10 @@ def validate_personality_change(old_personality: str, new_personality: str, serv
     Validates personality changes and logs them for moderation.
     """
     if new_personality not in VALID_PERSONALITIES:
-        print(f"Invalid personality change attempt: {new_personality} for server {server_id}")
+        logger.warning("Invalid personality change attempt: %s for server %s", new_personality, server_id)
         return False
     
-    print(f"Server {server_id} personality changed: {old_personality} → {new_personality}")
+    logger.info("Server %s personality changed: %s → %s", server_id, old_personality, new_personality)
     return True
 
 def get_personality_help_text() -> str:
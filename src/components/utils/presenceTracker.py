@@ -0,0 +1,81 @@
+import logging
+import os
+from typing import Dict, Optional
+from discord import Guild, Member
+
+logger = logging.getLogger('PresenceTracker')
+
+TRACKED_STATUSES = ('online', 'idle', 'dnd')
+
+# Members/presences are privileged intents; only request them when enabled in the developer portal
+PRIVILEGED_INTENTS = os.getenv("PRIVILEGED_INTENTS", "false").lower() == "true"
+
+
+def _status_bucket(member: Member) -> str:
+    status = str(getattr(member, 'status', 'offline'))
+    return status if status in TRACKED_STATUSES else 'offline'
+
+
+class PresenceTracker:
+    """
+    O(1) per-guild member counters (online, idle, dnd, bots, total members).
+
+    Seeded with a single pass over guild.members, then kept current by
+    on_presence_update, on_member_join and on_member_remove.
+    """
+
+    def __init__(self):
+        self._counts: Dict[int, Dict[str, int]] = {}  # guild_id -> counter name -> value
+
+    def is_tracking(self, guild_id: int) -> bool:
+        return guild_id in self._counts
+
+    def seed_guild(self, guild: Guild) -> Dict[str, int]:
+        """One full pass over the guild's members; every later update is O(1)"""
+        counts = {'online': 0, 'idle': 0, 'dnd': 0, 'offline': 0, 'bots': 0, 'members': guild.member_count or 0}
+        for member in guild.members:
+            counts[_status_bucket(member)] += 1
+            if member.bot:
+                counts['bots'] += 1
+
+        self._counts[guild.id] = counts
+        logger.info("👥 Seeded presence counters for '%s': %s", guild.name, counts)
+        return counts
+
+    def get_counts(self, guild: Guild) -> Dict[str, int]:
+        counts = self._counts.get(guild.id)
+        if counts is None:
+            counts = self.seed_guild(guild)
+        return counts
+
+    def on_presence_update(self, before: Member, after: Member) -> None:
+        counts = self._counts.get(after.guild.id)
+        if counts is None:
+            return
+        old_bucket, new_bucket = _status_bucket(before), _status_bucket(after)
+        if old_bucket != new_bucket:
+            counts[old_bucket] = max(0, counts[old_bucket] - 1)
+            counts[new_bucket] += 1
+
+    def on_member_join(self, member: Member) -> None:
+        self._adjust_member(member, 1)
+
+    def on_member_remove(self, member: Member) -> None:
+        self._adjust_member(member, -1)
+
+    def _adjust_member(self, member: Member, delta: int) -> None:
+        counts = self._counts.get(member.guild.id)
+        if counts is None:
+            return
+        bucket = _status_bucket(member)
+        counts[bucket] = max(0, counts[bucket] + delta)
+        counts['members'] = max(0, counts['members'] + delta)
+        if member.bot:
+            counts['bots'] = max(0, counts['bots'] + delta)
+
+    def drop_guild(self, guild_id: int) -> Optional[Dict[str, int]]:
+        return self._counts.pop(guild_id, None)
+
+
+# Shared, process-wide presence tracker
+presence_tracker = PresenceTracker()
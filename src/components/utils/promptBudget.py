@@ -0,0 +1,133 @@
+import logging
+import os
+import re
+from typing import List, Optional
+
+logger = logging.getLogger('PromptBudget')
+
+# Default total budget for an assembled prompt
+PROMPT_TOKEN_LIMIT = int(os.getenv("PROMPT_TOKEN_LIMIT", "3000"))
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a regex pre-tokenizer
+    _encoding = None
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+TRUNCATION_MARKER = "\n…"
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts tokens with the local tiktoken encoding when available, otherwise
+    approximates BPE tokens from words and punctuation (long words count extra).
+
+    tiktoken is not a declared dependency, so in a default install counts are the
+    approximation: budgets are close to, not exactly, the model's token counts.
+    """
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return sum(1 + len(piece) // 8 for piece in _TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Truncates text to at most max_tokens (marker included), cutting at line, then word boundaries"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    # Reserve room for the truncation marker
+    marker_cost = count_tokens(TRUNCATION_MARKER)
+    if max_tokens <= marker_cost:
+        return ""
+    budget = max_tokens - marker_cost
+
+    kept_lines = []
+    used = 0
+    for line in text.split("\n"):
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            # Fill what is left of the budget with the start of this line
+            words = []
+            for word in line.split(" "):
+                word_cost = count_tokens(word)
+                if used + word_cost > budget:
+                    break
+                words.append(word)
+                used += word_cost
+            if words:
+                kept_lines.append(" ".join(words))
+            break
+        kept_lines.append(line)
+        used += cost
+
+    # Per-piece costs are not exactly additive; drop trailing words until the joined text fits
+    truncated = "\n".join(kept_lines).rstrip()
+    while truncated and count_tokens(truncated + TRUNCATION_MARKER) > max_tokens:
+        truncated = truncated.rsplit(None, 1)[0] if len(truncated.split(None, 1)) > 1 else ""
+    return truncated + TRUNCATION_MARKER if truncated else ""
+
+
+class PromptSection:
+    """
+    One part of a prompt.
+
+    Args:
+        name: Section name (for logging)
+        text: Section content
+        priority: Lower is more important; the least important sections are trimmed first
+        max_tokens: Optional per-section cap applied before the total budget
+        required: Required sections are trimmed but never dropped
+    """
+
+    def __init__(self, name: str, text: str, priority: int, max_tokens: Optional[int] = None, required: bool = False):
+        self.name = name
+        self.text = text.strip()
+        self.priority = priority
+        self.max_tokens = max_tokens
+        self.required = required
+
+
+def assemble_prompt(sections: List[PromptSection], token_limit: int = PROMPT_TOKEN_LIMIT,
+                    separator: str = "\n\n", min_section_tokens: int = 32) -> str:
+    """
+    Joins sections (in the given order) into a prompt that fits token_limit.
+
+    Each section is first capped to its own max_tokens. If the total is still over
+    the limit, sections are visited from least to most important (ties: later
+    sections first) and trimmed to whatever budget remains; a non-required section
+    left with fewer than min_section_tokens is dropped. The result is deterministic
+    for the same input.
+    """
+    texts = {}
+    for i, section in enumerate(sections):
+        text = section.text
+        if section.max_tokens is not None:
+            text = truncate_to_tokens(text, section.max_tokens)
+        texts[i] = text
+
+    separator_cost = count_tokens(separator)
+    costs = {i: count_tokens(text) + separator_cost for i, text in texts.items() if text}
+    total = sum(costs.values())
+
+    if total > token_limit:
+        order = sorted(costs, key=lambda i: (sections[i].priority, i), reverse=True)
+        for i in order:
+            if total <= token_limit:
+                break
+            available = costs[i] - (total - token_limit) - separator_cost
+            if available < min_section_tokens and not sections[i].required:
+                logger.debug("✂️ Dropped prompt section '%s'", sections[i].name)
+                texts[i] = ""
+            else:
+                texts[i] = truncate_to_tokens(texts[i], max(available, 0))
+                logger.debug("✂️ Trimmed prompt section '%s' to %s tokens", sections[i].name, max(available, 0))
+            total -= costs[i]
+            costs[i] = count_tokens(texts[i]) + separator_cost if texts[i] else 0
+            total += costs[i]
+
+    return separator.join(texts[i] for i in range(len(sections)) if texts[i])
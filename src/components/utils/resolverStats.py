@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Sample = (timestamp, latency_seconds, messages_collected)
+Sample = Tuple[float, float, int]
+
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+HELP_STATS_WINDOW = float(os.getenv("HELP_STATS_WINDOW", "3600"))
+# Per-guild series kept at most; the least recently active guilds are dropped first
+HELP_STATS_MAX_GUILDS = int(os.getenv("HELP_STATS_MAX_GUILDS", "1000"))
+
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RollingSearchStats:
+    """
+    Process-wide help-search statistics over a rolling time window, overall and per guild.
+
+    Lifetime counters never reset; latency percentiles cover the last `window_seconds`
+    (at most `max_samples` searches per series). Guilds with no search in the window
+    are dropped, as are the least recently active ones beyond `max_guilds`. Safe to
+    read from the FastAPI thread: the lock is only held to prune and copy samples.
+
+    Args:
+        window_seconds: Length of the rolling window
+        max_samples: Cap on retained samples per series (overall and each guild)
+        max_guilds: Cap on the number of per-guild series
+    """
+
+    def __init__(self, window_seconds: float = 3600, max_samples: int = 2000, max_guilds: int = HELP_STATS_MAX_GUILDS):
+        self.window_seconds = window_seconds
+        self.max_samples = max_samples
+        self.max_guilds = max_guilds
+        self.started_at = time.time()
+        self.totals = {'searches': 0, 'empty_results': 0, 'errors': 0}
+        self._samples: Deque[Sample] = deque(maxlen=max_samples)
+        # guild_id -> (samples, lifetime searches), least recently active first
+        self._guilds: "OrderedDict[int, Tuple[Deque[Sample], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, guild_id: int, latency: float, messages_collected: int) -> None:
+        sample = (time.time(), latency, messages_collected)
+        with self._lock:
+            self.totals['searches'] += 1
+            if messages_collected == 0:
+                self.totals['empty_results'] += 1
+            self._samples.append(sample)
+            samples, searches = self._guilds.pop(guild_id, (None, 0))
+            if samples is None:
+                samples = deque(maxlen=self.max_samples)
+            samples.append(sample)
+            self._guilds[guild_id] = (samples, searches + 1)
+            while len(self._guilds) > self.max_guilds:
+                self._guilds.popitem(last=False)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.totals['errors'] += 1
+
+    @staticmethod
+    def _prune(samples: Deque[Sample], cutoff: float) -> None:
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+
+    @staticmethod
+    def _summarize(samples: List[Sample]) -> Dict[str, Any]:
+        latencies = sorted(latency for _, latency, _ in samples)
+        summary = {
+            'searches': len(latencies),
+            'mean_latency': sum(latencies) / len(latencies) if latencies else None,
+            'max_latency': latencies[-1] if latencies else None,
+            'mean_messages_collected': (sum(count for _, _, count in samples) / len(samples)) if samples else None,
+        }
+        for q in PERCENTILES:
+            summary[f'p{int(q * 100)}_latency'] = _percentile(latencies, q)
+        return summary
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Lifetime totals plus rolling-window latency percentiles, overall and per guild"""
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            self._prune(self._samples, cutoff)
+            window = list(self._samples)
+            guild_windows = {}
+            for guild_id, (samples, searches) in list(self._guilds.items()):
+                self._prune(samples, cutoff)
+                if samples:
+                    guild_windows[guild_id] = (list(samples), searches)
+                else:
+                    del self._guilds[guild_id]
+            totals = dict(self.totals)
+
+        guilds = {}
+        for guild_id, (samples, searches) in guild_windows.items():
+            guilds[str(guild_id)] = self._summarize(samples)
+            guilds[str(guild_id)]['lifetime_searches'] = searches
+        return {
+            'uptime_seconds': time.time() - self.started_at,
+            'window_seconds': self.window_seconds,
+            'totals': totals,
+            'window': self._summarize(window),
+            'guilds': guilds,
+        }
+
+
+# Shared, process-wide help-search statistics
+help_search_stats = RollingSearchStats(window_seconds=HELP_STATS_WINDOW)
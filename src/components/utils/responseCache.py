@@ -0,0 +1,85 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Optional, Tuple
+from src.components.utils.textFeatures import tokenize, STOP_WORDS
+
+logger = logging.getLogger('ResponseCache')
+
+
+def normalize_query(query: str) -> Tuple[str, FrozenSet[str]]:
+    """Returns the normalised query string and its content-token set"""
+    tokens = tokenize(query)
+    content_tokens = frozenset(token for token in tokens if token not in STOP_WORDS)
+    return " ".join(tokens), content_tokens
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    # Queries with no content tokens ("what?", "huh?") are never near-duplicates of anything
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of generated replies, keyed by guild, personality, guild-state
+    version and normalised query. Near-duplicate queries (token-set Jaccard
+    similarity above the threshold) within the same key space also hit.
+
+    Args:
+        max_entries: LRU capacity
+        ttl_seconds: Lifetime of a cached reply
+        similarity_threshold: Minimum Jaccard similarity for a near-duplicate hit
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 600, similarity_threshold: float = 0.8):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        # (guild_id, personality, version, normalized_query) -> (content_tokens, response, expires_at)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.stats = {'hits': 0, 'near_hits': 0, 'misses': 0}
+
+    def get(self, guild_id: int, personality: str, version: int, query: str) -> Optional[str]:
+        normalized, tokens = normalize_query(query)
+        now = time.monotonic()
+
+        key = (guild_id, personality, version, normalized)
+        entry = self._entries.get(key)
+        if entry and entry[2] > now:
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[1]
+
+        best_key, best_score = None, 0.0
+        for other_key, (other_tokens, _, expires_at) in list(self._entries.items()):
+            if expires_at <= now:
+                del self._entries[other_key]
+                continue
+            if other_key[:3] != key[:3]:
+                continue
+            score = _jaccard(tokens, other_tokens)
+            if score > best_score:
+                best_key, best_score = other_key, score
+
+        if best_key is not None and best_score >= self.similarity_threshold:
+            self._entries.move_to_end(best_key)
+            self.stats['near_hits'] += 1
+            logger.debug("💾 Near-duplicate cache hit (%.2f) for '%s'", best_score, query)
+            return self._entries[best_key][1]
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, guild_id: int, personality: str, version: int, query: str, response: str) -> None:
+        normalized, tokens = normalize_query(query)
+        key = (guild_id, personality, version, normalized)
+        self._entries[key] = (tokens, response, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Cache for server_info replies
+server_info_cache = ResponseCache()
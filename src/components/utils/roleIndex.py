@@ -0,0 +1,65 @@
+import logging
+from typing import Dict, List
+from discord import Guild, Role
+
+logger = logging.getLogger('RoleIndex')
+
+# Any of these permissions makes a role a staff role
+STAFF_PERMISSIONS = ('administrator', 'manage_guild', 'manage_channels', 'manage_messages')
+
+
+def classify_role(role: Role) -> str:
+    """Returns 'staff', 'special' or 'member' for a role"""
+    permissions = role.permissions
+    if any(getattr(permissions, perm, False) for perm in STAFF_PERMISSIONS):
+        return 'staff'
+    if role.mentionable or role.hoist:
+        return 'special'
+    return 'member'
+
+
+class RoleIndex:
+    """
+    Precomputed role classification and position-sorted hierarchy for one guild.
+
+    Built once and rebuilt only after on_guild_role_create/update/delete
+    invalidates it.
+    """
+
+    def __init__(self, guild: Guild):
+        self.total_roles = len(guild.roles)
+        # Highest role first, @everyone excluded
+        self.hierarchy: List[Role] = sorted(
+            (role for role in guild.roles if not role.is_default()),
+            key=lambda r: r.position, reverse=True
+        )
+        self.role_types: Dict[int, str] = {role.id: classify_role(role) for role in self.hierarchy}
+
+        self.staff_roles = [role.name for role in self.hierarchy if self.role_types[role.id] == 'staff']
+        self.special_roles = [role.name for role in self.hierarchy if self.role_types[role.id] == 'special']
+        self.member_roles = [role.name for role in self.hierarchy if self.role_types[role.id] == 'member']
+
+    def role_type(self, role: Role) -> str:
+        return self.role_types.get(role.id) or classify_role(role)
+
+    def sort_roles(self, roles: List[Role]) -> List[Role]:
+        """Sorts roles highest first, dropping @everyone"""
+        return sorted((role for role in roles if not role.is_default()), key=lambda r: r.position, reverse=True)
+
+
+# guild_id -> RoleIndex
+role_indexes: Dict[int, RoleIndex] = {}
+
+
+def get_role_index(guild: Guild) -> RoleIndex:
+    """Returns the guild's role index, building it on first use"""
+    index = role_indexes.get(guild.id)
+    if index is None:
+        index = RoleIndex(guild)
+        role_indexes[guild.id] = index
+        logger.debug("🏷️ Built role index for '%s' (%s roles)", guild.name, index.total_roles)
+    return index
+
+
+def invalidate_role_index(guild_id: int) -> None:
+    role_indexes.pop(guild_id, None)
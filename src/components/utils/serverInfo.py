@@ -1,6 +1,70 @@
 import logging
 from typing import Dict, Any
 from discord import Guild, TextChannel, VoiceChannel, CategoryChannel
+from src.components.utils.presenceTracker import PRIVILEGED_INTENTS, presence_tracker
+from src.components.utils.roleIndex import get_role_index
+
+logger = logging.getLogger('ServerInfo')
+
+# Static, hand-written overview of THE RALS included in every server context
+RALS_OVERVIEW = """    🎮 Overview of THE RALS
+    •	Server Name: THE RALS
+    •	Creation Date: March 9, 2021
+    •	Member Count: Approximately 4344 members
+    •	Online Users: Around 2048 online at a time
+    •	Language: English, Hindi, Urdu
+    •	Region: Global
+    •	Invite Link: discord.gg/therals
+
+    THE RALS is designed as a safe and inclusive community for making friends, chilling, and enjoyment under one roof. It welcomes everyone regardless of age, gender, religion, etc. The server offers a variety of activities, including movie nights, song sessions, voice chat sessions, gaming, and daily streams. It also hosts fun events, activities, and weekly tournaments. Additionally, THE RALS has its own gaming clan that members can benefit from.
+
+
+    👥 Staff & Community Structure
+    the server is described as having a dedicated staff that actively moderates daily to ensure a chill and safe environment for everyone. 
+    Owners/Founders: Kat ( Pakistani ) , Anu and Tribb (Indian)
+    Co-Owner: Muski ( Pakistani/Canadian )
+
+    Admins: Asad, Liam, Todo
+
+    Moderator: Sarurah
+
+    Staff and Tournament Manager: botMAN
+
+    Community Features
+    •	Events & Activities:
+    o	Movie Nights
+    o	Game Nights
+    o	Tournaments with great prizes
+    o	Daily fun activities
+    o	QOTD (Question of the Day)
+    o	Polls
+    Channels & Bots:
+    •	Dedicated text channels for various topics
+    •	Separate and numerous voice channels for each topic
+    •	Fun bots like Dank Memer, Idle RPG, etc.
+
+    Community Engagement:
+    •	Welcoming and friendly public community
+    •	Supportive environment for gamers, content creators, and individuals seeking support
+    Encouragement for sharing artistic creations and helping with school work
+
+    📌 Organizational Highlights
+    •	Inclusivity: THE RALS embraces diversity and welcomes everyone with open arms, regardless of age, sexuality, race, or religion. 
+    •	Level 3 Perks: The server has achieved Level 3 perks, indicating a high level of community engagement and support. 
+    •	Gaming Clan: Members can benefit from THE RALS' own gaming clan, which provides additional opportunities for collaboration and competition. 
+
+    🏆 THE RALS: A Rising Esports Organization with a Thriving Community and Big Ambitions
+    THE RALS is not just a popular Discord server — it's an emerging esports organization rooted in community, competition, and creativity. Known for hosting regular tournaments, engaging events, and supporting a wide range of competitive games, THE RALS has quickly built a name for itself within the Pakistani gaming scene. The organization has successfully run weekly events, scrims, and clan wars across titles like Valorant, PUBG, with participation from both amateur and semi-pro players.
+    In the near future, THE RALS plans to:
+    •	Launch official esports rosters across multiple games.
+    •	Collaborate with influencers and streamers to expand its reach.
+    •	Host sponsored tournaments with cash prizes and brand partnerships.
+    •	Develop a content creation wing featuring YouTube and Twitch streams.
+    •	Establish a mentorship and coaching program for rising talent in the community.
+    Backed by an engaged team and a passionate player base, THE RALS is on track to become a major force in the regional esports ecosystem.
+
+
+"""
 
 def get_server_info(guild: Guild) -> Dict[str, Any]:
     """
@@ -44,7 +108,7 @@ def get_server_info(guild: Guild) -> Dict[str, Any]:
         return basic_info
         
     except Exception as e:
-        logging.error(f"Error extracting server info for {guild.name}: {e}")
+        logger.error("Error extracting server info for %s: %s", guild.name, e)
         # Return basic fallback information
         return {
             "name": guild.name,
@@ -80,7 +144,7 @@ def _get_channels_info(guild: Guild) -> Dict[str, Any]:
             "notable_channels": notable_channels
         }
     except Exception as e:
-        logging.error(f"Error getting channel info: {e}")
+        logger.error("Error getting channel info: %s", e)
         return {
             "total_channels": len(guild.channels) if guild.channels else 0,
             "text_channels_count": 0,
@@ -90,39 +154,19 @@ def _get_channels_info(guild: Guild) -> Dict[str, Any]:
         }
 
 def _get_roles_info(guild: Guild) -> Dict[str, Any]:
-    """Extract role-related information from the guild."""
+    """Extract role-related information from the guild's cached role index."""
     try:
-        roles = guild.roles
-        
-        # Filter out @everyone role and get meaningful roles
-        meaningful_roles = [role for role in roles if role.name != "@everyone"]
-        
-        # Get role hierarchy (top roles)
-        top_roles = sorted(meaningful_roles, key=lambda r: r.position, reverse=True)[:10]
-        
-        # Categorize roles
-        staff_roles = []
-        special_roles = []
-        member_roles = []
-        
-        for role in meaningful_roles:
-            if any(perm in ['administrator', 'manage_guild', 'manage_channels', 'manage_messages'] 
-                   for perm, value in role.permissions if value):
-                staff_roles.append(role.name)
-            elif role.mentionable or role.hoist:
-                special_roles.append(role.name)
-            else:
-                member_roles.append(role.name)
+        index = get_role_index(guild)
         
         return {
-            "total_roles": len(roles),
-            "staff_roles": staff_roles[:5],  # Limit output
-            "special_roles": special_roles[:8],
-            "member_roles_count": len(member_roles),
-            "top_roles": [role.name for role in top_roles[:5]]
+            "total_roles": index.total_roles,
+            "staff_roles": index.staff_roles[:5],  # Limit output
+            "special_roles": index.special_roles[:8],
+            "member_roles_count": len(index.member_roles),
+            "top_roles": [role.name for role in index.hierarchy[:5]]
         }
     except Exception as e:
-        logging.error(f"Error getting roles info: {e}")
+        logger.error("Error getting roles info: %s", e)
         return {
             "total_roles": len(guild.roles) if guild.roles else 0,
             "staff_roles": [],
@@ -132,29 +176,34 @@ def _get_roles_info(guild: Guild) -> Dict[str, Any]:
         }
 
 def _get_members_info(guild: Guild) -> Dict[str, Any]:
-    """Extract member-related information from the guild."""
+    """Extract member-related information from the guild's presence counters."""
+    if not PRIVILEGED_INTENTS:
+        # No member list or presences without the privileged intents
+        return {
+            "member_count": guild.member_count or 0,
+            "online_members": "Unknown",
+            "bot_count": "Unknown",
+            "human_members": "Unknown"
+        }
     try:
-        # Note: In many cases, guild.members might not be fully populated
-        # unless the bot has proper intents and permissions
-        
-        online_count = 0
-        bot_count = 0
-        
-        if guild.members:
-            for member in guild.members:
-                if hasattr(member, 'status') and str(member.status) != 'offline':
-                    online_count += 1
-                if member.bot:
-                    bot_count += 1
+        # Counters are seeded once from guild.members and kept current by
+        # presence/member events, so this is O(1) after the first call
+        counts = presence_tracker.get_counts(guild)
+        online_count = counts['online'] + counts['idle'] + counts['dnd']
+        member_count = counts['members'] or guild.member_count
         
         return {
+            "member_count": member_count,
             "online_members": online_count if guild.members else "Unknown",
-            "bot_count": bot_count,
-            "human_members": (guild.member_count - bot_count) if guild.member_count else "Unknown"
+            "idle_members": counts['idle'],
+            "dnd_members": counts['dnd'],
+            "bot_count": counts['bots'],
+            "human_members": (member_count - counts['bots']) if member_count else "Unknown"
         }
     except Exception as e:
-        logging.error(f"Error getting members info: {e}")
+        logger.error("Error getting members info: %s", e)
         return {
+            "member_count": guild.member_count or 0,
             "online_members": "Unknown",
             "bot_count": 0,
             "human_members": guild.member_count or "Unknown"
@@ -191,7 +240,7 @@ def _get_features_info(guild: Guild) -> Dict[str, Any]:
             "mfa_level": "Required" if guild.mfa_level else "Not Required"
         }
     except Exception as e:
-        logging.error(f"Error getting features info: {e}")
+        logger.error("Error getting features info: %s", e)
         return {
             "server_features": [],
             "explicit_content_filter": "Unknown",
@@ -199,19 +248,36 @@ def _get_features_info(guild: Guild) -> Dict[str, Any]:
             "mfa_level": "Unknown"
         }
 
-def generate_context_from_guild(guild: Guild) -> str:
+def generate_context_from_guild(guild: Guild, include_static: bool = True) -> str:
     """
     Generates comprehensive server context string with detailed information
     formatted for AI consumption.
+
+    Served from the guild's incrementally maintained GuildSnapshot, so repeated
+    calls cost O(1) instead of walking channels, roles and members.
     
     Args:
         guild: Discord guild object containing server information
+        include_static: Include the static RALS overview; leave it out when the
+            overview is already part of the agent's system prompt
         
     Returns:
         Formatted string containing comprehensive server information
     """
-    info = get_server_info(guild)
+    return get_guild_snapshot(guild).render(include_static)
+
+def render_server_context(info: Dict[str, Any], include_static: bool = True) -> str:
+    """
+    Renders server information (as returned by get_server_info) into the
+    context string used in AI prompts.
     
+    Args:
+        info: Server information dictionary
+        include_static: Include the static RALS overview
+        
+    Returns:
+        Formatted string containing comprehensive server information
+    """
     # Build context sections
     context_sections = []
     
@@ -222,66 +288,12 @@ def generate_context_from_guild(guild: Guild) -> str:
     Server ID: {info['id']}
     Total Members: {info['member_count']}
     Verification Level: {info.get('verification_level', 'Unknown')}
-    general server info: 
-    🎮 Overview of THE RALS
-    •	Server Name: THE RALS
-    •	Creation Date: March 9, 2021
-    •	Member Count: Approximately 4344 members
-    •	Online Users: Around 2048 online at a time
-    •	Language: English, Hindi, Urdu
-    •	Region: Global
-    •	Invite Link: discord.gg/therals
-
-    THE RALS is designed as a safe and inclusive community for making friends, chilling, and enjoyment under one roof. It welcomes everyone regardless of age, gender, religion, etc. The server offers a variety of activities, including movie nights, song sessions, voice chat sessions, gaming, and daily streams. It also hosts fun events, activities, and weekly tournaments. Additionally, THE RALS has its own gaming clan that members can benefit from.
-
-
-    👥 Staff & Community Structure
-    the server is described as having a dedicated staff that actively moderates daily to ensure a chill and safe environment for everyone. 
-    Owners/Founders: Kat ( Pakistani ) , Anu and Tribb (Indian)
-    Co-Owner: Muski ( Pakistani/Canadian )
-
-    Admins: Asad, Liam, Todo
-
-    Moderator: Sarurah
-
-    Staff and Tournament Manager: botMAN
-
-    Community Features
-    •	Events & Activities:
-    o	Movie Nights
-    o	Game Nights
-    o	Tournaments with great prizes
-    o	Daily fun activities
-    o	QOTD (Question of the Day)
-    o	Polls
-    Channels & Bots:
-    •	Dedicated text channels for various topics
-    •	Separate and numerous voice channels for each topic
-    •	Fun bots like Dank Memer, Idle RPG, etc.
-
-    Community Engagement:
-    •	Welcoming and friendly public community
-    •	Supportive environment for gamers, content creators, and individuals seeking support
-    Encouragement for sharing artistic creations and helping with school work
-
-    📌 Organizational Highlights
-    •	Inclusivity: THE RALS embraces diversity and welcomes everyone with open arms, regardless of age, sexuality, race, or religion. 
-    •	Level 3 Perks: The server has achieved Level 3 perks, indicating a high level of community engagement and support. 
-    •	Gaming Clan: Members can benefit from THE RALS' own gaming clan, which provides additional opportunities for collaboration and competition. 
-
-    🏆 THE RALS: A Rising Esports Organization with a Thriving Community and Big Ambitions
-    THE RALS is not just a popular Discord server — it's an emerging esports organization rooted in community, competition, and creativity. Known for hosting regular tournaments, engaging events, and supporting a wide range of competitive games, THE RALS has quickly built a name for itself within the Pakistani gaming scene. The organization has successfully run weekly events, scrims, and clan wars across titles like Valorant, PUBG, with participation from both amateur and semi-pro players.
-    In the near future, THE RALS plans to:
-    •	Launch official esports rosters across multiple games.
-    •	Collaborate with influencers and streamers to expand its reach.
-    •	Host sponsored tournaments with cash prizes and brand partnerships.
-    •	Develop a content creation wing featuring YouTube and Twitch streams.
-    •	Establish a mentorship and coaching program for rising talent in the community.
-    Backed by an engaged team and a passionate player base, THE RALS is on track to become a major force in the regional esports ecosystem.
-
-
 """
     
+    if include_static:
+        basic_section += f"""    general server info: 
+{RALS_OVERVIEW}"""
+    
     if info.get('description'):
         basic_section += f"\nServer Description: {info['description']}"
     
@@ -342,6 +354,8 @@ Bots: {info.get('bot_count', 0)}"""
     
     if info.get('online_members') != "Unknown":
         members_section += f"\nCurrently Online: {info['online_members']}"
+        if info.get('idle_members') or info.get('dnd_members'):
+            members_section += f" ({info.get('idle_members', 0)} idle, {info.get('dnd_members', 0)} do not disturb)"
     
     context_sections.append(members_section)
     
@@ -368,7 +382,7 @@ def validate_guild_for_context_generation(guild: Guild) -> bool:
     
     for attr in required_attributes:
         if not hasattr(guild, attr) or getattr(guild, attr) is None:
-            logging.warning(f"Guild missing required attribute: {attr}")
+            logger.warning("Guild missing required attribute: %s", attr)
             return False
     
     return True
@@ -400,4 +414,94 @@ def get_server_context_summary(guild: Guild) -> str:
     if info.get('server_features'):
         summary_parts.append(f"Features: {', '.join(info['server_features'][:2])}")
     
-    return " • ".join(summary_parts)
\ No newline at end of file
+    return " • ".join(summary_parts)
+
+class GuildSnapshot:
+    """
+    Incrementally maintained server information for one guild.
+
+    Built once with get_server_info, then kept current by gateway events through
+    O(1) counter updates (channels here, members via the presence tracker) or a
+    targeted section refresh. The rendered context
+    string is cached and only re-rendered after a field has changed.
+    """
+
+    def __init__(self, guild: Guild):
+        self.guild_id = guild.id
+        self.info = get_server_info(guild)
+        self._rendered: Dict[bool, str] = {}  # include_static -> rendered context
+
+    def _changed(self) -> None:
+        self._rendered.clear()
+
+    def render(self, include_static: bool = True) -> str:
+        if include_static not in self._rendered:
+            self._rendered[include_static] = render_server_context(self.info, include_static)
+        return self._rendered[include_static]
+
+    # ---- guild ----
+
+    def refresh_basic(self, guild: Guild) -> None:
+        """Refresh top-level settings and features after on_guild_update"""
+        self.info.update({
+            "name": guild.name,
+            "description": getattr(guild, 'description', None),
+            "verification_level": str(guild.verification_level).replace('_', ' ').title(),
+            "boost_level": guild.premium_tier,
+            "boost_count": guild.premium_subscription_count,
+        })
+        self.info.update(_get_features_info(guild))
+        self._changed()
+
+    # ---- channels ----
+
+    def on_channel_create(self, channel) -> None:
+        self._count_channel(channel, 1)
+
+    def on_channel_delete(self, channel) -> None:
+        self._count_channel(channel, -1)
+
+    def _count_channel(self, channel, delta: int) -> None:
+        self.info["total_channels"] = self.info.get("total_channels", 0) + delta
+        if isinstance(channel, TextChannel):
+            self.info["text_channels_count"] = self.info.get("text_channels_count", 0) + delta
+            self.refresh_notable_channels(channel.guild)
+        elif isinstance(channel, VoiceChannel):
+            self.info["voice_channels_count"] = self.info.get("voice_channels_count", 0) + delta
+        elif isinstance(channel, CategoryChannel):
+            self.info["categories_count"] = self.info.get("categories_count", 0) + delta
+        self._changed()
+
+    def refresh_notable_channels(self, guild: Guild) -> None:
+        """Refresh the notable channel list after a text channel was created, renamed or re-topiced"""
+        self.info["notable_channels"] = _get_channels_info(guild)["notable_channels"]
+        self._changed()
+
+    # ---- roles ----
+
+    def refresh_roles(self, guild: Guild) -> None:
+        """Re-derive role information after a role event"""
+        self.info.update(_get_roles_info(guild))
+        self._changed()
+
+    # ---- members ----
+
+    def refresh_members(self, guild: Guild) -> None:
+        """Pull member counts from the presence tracker after a presence or member event"""
+        self.info.update(_get_members_info(guild))
+        self._changed()
+
+
+# guild_id -> GuildSnapshot
+guild_snapshots: Dict[int, GuildSnapshot] = {}
+
+def get_guild_snapshot(guild: Guild) -> GuildSnapshot:
+    """Returns the guild's snapshot, building it on first use"""
+    snapshot = guild_snapshots.get(guild.id)
+    if snapshot is None:
+        snapshot = GuildSnapshot(guild)
+        guild_snapshots[guild.id] = snapshot
+    return snapshot
+
+def drop_guild_snapshot(guild_id: int) -> None:
+    guild_snapshots.pop(guild_id, None)
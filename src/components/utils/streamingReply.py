@@ -0,0 +1,87 @@
+import logging
+import os
+import time
+from typing import Optional
+import discord
+
+logger = logging.getLogger('StreamingReply')
+
+# Opt-in: stream LLM replies into Discord through progressive message edits
+STREAM_REPLIES = os.getenv("STREAM_REPLIES", "false").lower() == "true"
+
+# Discord allows 5 message edits per 5 seconds per channel; stay well under it
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1.2"))
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+def _fit(text: str) -> str:
+    """Trim text to Discord's message length limit"""
+    if len(text) <= DISCORD_MESSAGE_LIMIT:
+        return text
+    return text[:DISCORD_MESSAGE_LIMIT - 1] + "…"
+
+
+async def stream_agent_reply(agent, prompt: str, channel: discord.abc.Messageable, prefix: str = "",
+                             reply_message: Optional[discord.Message] = None,
+                             fallback: str = "🤖 I couldn't generate a response.") -> str:
+    """
+    Streams an agent's completion into Discord.
+
+    Posts (or reuses `reply_message` as) the reply as soon as the first tokens arrive,
+    then coalesces further tokens into edits at most every STREAM_EDIT_INTERVAL seconds.
+    If the stream fails, a reply posted by this call is deleted so a retry starts clean.
+
+    Args:
+        agent: agno Agent to run
+        prompt: Prompt to send
+        channel: Channel to post the reply in when no `reply_message` is given
+        prefix: Text placed before the streamed content (e.g. the user mention)
+        reply_message: Existing message (e.g. a "thinking" notice) to edit instead of posting
+        fallback: Content used when the model produced nothing
+
+    Returns:
+        The full generated text (without the prefix); empty when the model produced
+        nothing and the fallback was shown instead
+    """
+    content = ""
+    last_edit = 0.0
+    posted_message: Optional[discord.Message] = None
+
+    try:
+        response_stream = await agent.arun(message=prompt, stream=True)
+        async for chunk in response_stream:
+            delta = getattr(chunk, "content", None)
+            if not isinstance(delta, str) or not delta:
+                continue
+            content += delta
+
+            now = time.monotonic()
+            if now - last_edit < STREAM_EDIT_INTERVAL:
+                continue
+
+            if reply_message is None:
+                reply_message = posted_message = await channel.send(_fit(f"{prefix}{content.rstrip()} ▌"))
+            else:
+                await reply_message.edit(content=_fit(f"{prefix}{content.rstrip()} ▌"))
+            last_edit = now
+    except BaseException:
+        # The call may be retried (rate limit, failover): don't leave a half-written reply behind.
+        # A caller-provided reply_message is simply overwritten by the retry.
+        if posted_message is not None:
+            try:
+                await posted_message.delete()
+            except discord.HTTPException as e:
+                logger.warning("⚠️ Could not delete partial streamed reply: %s", e)
+        raise
+    finally:
+        # agno leaves agent.stream set after a streamed run; pooled agents must not keep it
+        agent.stream = False
+
+    final_text = content.strip() or fallback
+    if reply_message is None:
+        await channel.send(_fit(f"{prefix}{final_text}"))
+    else:
+        await reply_message.edit(content=_fit(f"{prefix}{final_text}"))
+
+    logger.debug("Streamed reply of %s chars", len(content))
+    return content.strip()
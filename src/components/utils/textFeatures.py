@@ -0,0 +1,48 @@
+"""Dependency-free text features shared by channel profiles, passage ranking and caches"""
+import math
+import re
+import zlib
+from typing import List, Set
+
+EMBEDDING_DIMS = 256
+
+STOP_WORDS = {
+    'the', 'is', 'at', 'which', 'on', 'a', 'an', 'and', 'or', 'but', 'in', 'with', 'to', 'for', 'of', 'as', 'by',
+    'how', 'what', 'where', 'when', 'why', 'i', 'me', 'my', 'we', 'our', 'you', 'your', 'can', 'tell', 'that',
+    'this', 'need', 'some', 'help', 'please', 'are', 'was', 'there', 'any', 'about', 'does', 'do', 'it'
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases text and splits it into alphanumeric tokens, dropping raw mention/snowflake ids."""
+    tokens = re.findall(r"[a-z0-9]+", text.lower())
+    return [token for token in tokens if not (token.isdigit() and len(token) > 6)]
+
+
+def extract_keywords(text: str) -> Set[str]:
+    """Extracts meaningful keywords (no stop words, at least 3 chars) from text."""
+    return {token for token in tokenize(text) if len(token) > 2 and token not in STOP_WORDS}
+
+
+def embed_text(text: str, dims: int = EMBEDDING_DIMS) -> List[float]:
+    """
+    Builds a local hashed bag-of-words embedding (unigrams plus character trigrams).
+
+    Uses crc32 rather than hash() so embeddings stay stable across restarts and
+    can be persisted alongside the profiles.
+    """
+    vector = [0.0] * dims
+    for token in tokenize(text):
+        features = [token] + [token[i:i + 3] for i in range(len(token) - 2)]
+        for feature in features:
+            vector[zlib.crc32(feature.encode("utf-8")) % dims] += 1.0
+
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        return vector
+    return [round(value / norm, 5) for value in vector]
+
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    """Cosine similarity for embeddings that are already L2-normalised."""
+    return sum(x * y for x, y in zip(a, b))
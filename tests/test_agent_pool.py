@@ -0,0 +1,67 @@
+import importlib.util
+import unittest
+from types import SimpleNamespace
+
+HAS_DEPS = bool(importlib.util.find_spec("agno") and importlib.util.find_spec("discord"))
+
+if HAS_DEPS:
+    from src.components.agents.agentPool import AgentPool
+
+
+class FakeMemory:
+    def __init__(self):
+        self.runs = []
+
+    def clear(self):
+        self.runs = []
+
+
+class FakeAgent:
+    def __init__(self):
+        self.memory = FakeMemory()
+        self.run_response = None
+
+    def run(self, message):
+        self.memory.runs.append(message)
+        self.run_response = message
+        return message
+
+
+@unittest.skipUnless(HAS_DEPS, "agno and discord.py are required")
+class AgentPoolTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.pool = AgentPool(lambda guild, personality, model_id: FakeAgent(), max_size=4)
+        self.guild = SimpleNamespace(id=1)
+
+    async def test_reused_agent_memory_does_not_grow(self):
+        sizes = []
+        agents = []
+        for message in ("first", "second"):
+            async with self.pool.lease(self.guild, "default", "model") as agent:
+                agent.run(message)
+                sizes.append(len(agent.memory.runs))
+                agents.append(agent)
+        self.assertIs(agents[0], agents[1])
+        self.assertEqual(sizes, [1, 1])
+        self.assertEqual(len(agents[1].memory.runs), 0)
+        self.assertEqual(self.pool.stats['reused'], 1)
+
+    async def test_failed_run_discards_agent(self):
+        with self.assertRaises(RuntimeError):
+            async with self.pool.lease(self.guild, "default", "model"):
+                raise RuntimeError("boom")
+        self.assertEqual(self.pool.size(), 0)
+        self.assertEqual(self.pool.stats['discarded'], 1)
+
+    async def test_evicts_least_recently_used_keys(self):
+        pool = AgentPool(lambda guild, personality, model_id: FakeAgent(), max_size=1)
+        async with pool.lease(self.guild, "a", "model"):
+            pass
+        async with pool.lease(self.guild, "b", "model"):
+            pass
+        self.assertEqual(pool.size(), 1)
+        self.assertEqual(pool.stats['evicted'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import importlib.util
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+HAS_DEPS = bool(importlib.util.find_spec("agno") and importlib.util.find_spec("discord"))
+
+if HAS_DEPS:
+    from src.components.utils import helpResolver, intentClassifier
+
+
+def make_channel(channel_id: int, name: str, guild) -> SimpleNamespace:
+    return SimpleNamespace(id=channel_id, name=name, topic="", guild=guild)
+
+
+@unittest.skipUnless(HAS_DEPS, "agno and discord.py are required")
+class RankChannelsBatchedTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        guild = SimpleNamespace(id=42)
+        self.channels = [make_channel(1, "general", guild), make_channel(2, "help", guild)]
+        self.resolver = helpResolver.OptimizedHelpResolver(ranking_mode="batched")
+        self.submit = mock.AsyncMock(side_effect=[RuntimeError("429 Too Many Requests"), SimpleNamespace(content="[2, 1]")])
+        for patcher in (
+            mock.patch.object(intentClassifier.llm_scheduler, "submit", self.submit),
+            mock.patch.object(intentClassifier, "get_classifier", mock.Mock()),
+            mock.patch.object(intentClassifier, "classifier_backend", mock.Mock(return_value="groq:test")),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_failed_ranking_is_not_cached(self):
+        profile_match = [make_channel(2, "help", None), make_channel(99, "elsewhere", None)]
+        with mock.patch.object(self.resolver, "match_channel_profiles", return_value=profile_match), \
+                mock.patch.object(self.resolver, "batch_classify_channels", mock.AsyncMock(return_value=[])) as per_channel:
+            fallback = await self.resolver.rank_channels_batched(self.channels, "how do i join?")
+            # Only profile matches among the candidates are used, without a per-channel LLM fallback
+            self.assertEqual([c.id for c in fallback], [2])
+            per_channel.assert_not_awaited()
+            self.assertEqual(len(self.resolver.channel_cache), 0)
+
+            ranked = await self.resolver.rank_channels_batched(self.channels, "how do i join?")
+            self.assertEqual([c.id for c in ranked], [2, 1])
+
+            cached = await self.resolver.rank_channels_batched(self.channels, "how do i join?")
+            self.assertEqual([c.id for c in cached], [2, 1])
+        self.assertEqual(self.submit.await_count, 2)
+
+    async def test_per_channel_fallback_when_no_profile_matches(self):
+        with mock.patch.object(self.resolver, "match_channel_profiles", return_value=[]), \
+                mock.patch.object(self.resolver, "batch_classify_channels",
+                                  mock.AsyncMock(return_value=[self.channels[1]])) as per_channel:
+            fallback = await self.resolver.rank_channels_batched(self.channels, "how do i join?")
+        self.assertEqual(fallback, [self.channels[1]])
+        per_channel.assert_awaited_once()
+        self.assertEqual(len(self.resolver.channel_cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
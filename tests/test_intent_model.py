@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.components.utils import intentModel
+from src.components.utils.intentModel import TfidfLogisticIntentModel, cross_validate, load_local_intent_model
+
+HELP = ["how do i join the {}", "can you help me with the {}", "i'm stuck on the {}", "help me fix the {}",
+        "problem with the {}", "how do i set up the {}"]
+SMALL_TALK = ["hello everyone, love the {}", "thanks for the {}", "good morning, nice {}", "lol that {}",
+              "haha the {} is great", "gg on the {}"]
+TOPICS = ["tournament", "voice chat", "bot", "quest", "event"]
+
+
+def make_samples():
+    return ([(template.format(topic), "user_wants_help") for template in HELP for topic in TOPICS] +
+            [(template.format(topic), "general") for template in SMALL_TALK for topic in TOPICS])
+
+
+class TrainingChecksTest(unittest.TestCase):
+    def test_refuses_a_single_label(self):
+        with self.assertRaises(ValueError):
+            TfidfLogisticIntentModel.fit([(f"hello {i}", "general") for i in range(10)])
+
+    def test_refuses_too_few_samples_per_label(self):
+        samples = [(f"hello {i}", "general") for i in range(10)] + [("how do i join", "user_wants_help")]
+        with self.assertRaises(ValueError):
+            TfidfLogisticIntentModel.fit(samples, min_samples_per_label=5)
+        with self.assertRaises(ValueError):
+            cross_validate(samples, min_samples_per_label=5)
+
+    def test_cross_validated_accuracy_on_separable_data(self):
+        self.assertGreaterEqual(cross_validate(make_samples(), epochs=10), 0.9)
+
+
+class LoadGateTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "model.json")
+        self.model = TfidfLogisticIntentModel.fit(make_samples(), epochs=5)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_model_without_recorded_accuracy_is_refused(self):
+        self.model.save(self.path)
+        self.assertIsNone(load_local_intent_model(self.path))
+
+    def test_model_below_threshold_is_refused(self):
+        self.model.heldout_accuracy = 0.5
+        self.model.save(self.path)
+        with mock.patch.object(intentModel, "INTENT_MODEL_MIN_ACCURACY", 0.8):
+            self.assertIsNone(load_local_intent_model(self.path))
+
+    def test_accurate_model_is_loaded(self):
+        self.model.heldout_accuracy = 0.95
+        self.model.save(self.path)
+        with mock.patch.object(intentModel, "INTENT_MODEL_MIN_ACCURACY", 0.8):
+            loaded = load_local_intent_model(self.path)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded.heldout_accuracy, 0.95)
+        self.assertEqual(loaded("how do i join the raid")[0], "user_wants_help")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from src.components.utils.intentRules import RULE_CONFIDENCE_THRESHOLD, classify_intent_by_rules, parse_intent_label
+
+
+class ClassifyIntentByRulesTest(unittest.TestCase):
+    def assertIntent(self, message, intent, mention_count=0):
+        decision = classify_intent_by_rules(message, mention_count)
+        self.assertIsNotNone(decision, message)
+        self.assertEqual(decision["intent"], intent, message)
+        self.assertEqual(decision["tier"], "rules")
+        self.assertGreaterEqual(decision["confidence"], RULE_CONFIDENCE_THRESHOLD)
+
+    def test_empty_message_is_general(self):
+        self.assertIntent("   ", "general")
+
+    def test_help_keywords(self):
+        for message in ("HELP: my bot is offline", "can you help with roles?", "How do I join the tournament",
+                        "I'm stuck on the quest", "problem with voice chat", "need some assistance"):
+            self.assertIntent(message, "user_wants_help")
+
+    def test_help_wins_over_mentions(self):
+        self.assertIntent("@sam can you help me?", "user_wants_help", mention_count=1)
+
+    def test_small_talk(self):
+        for message in ("hello everyone!", "thanks", "good morning", "lol", "thank you so much"):
+            self.assertIntent(message, "general")
+
+    def test_thanking_a_mentioned_user_is_general(self):
+        self.assertIntent("@sam thanks", "general", mention_count=1)
+        self.assertIntent("@sam @alex thank you!", "general", mention_count=2)
+
+    def test_server_info_without_mentions(self):
+        for message in ("What are the server rules?", "how many members are here", "who are the mods",
+                        "what channels do we have"):
+            self.assertIntent(message, "server_info")
+
+    def test_server_info_needs_no_mentions(self):
+        self.assertIsNone(classify_intent_by_rules("@sam what are the rules", mention_count=1))
+
+    def test_user_info_needs_a_mention(self):
+        self.assertIntent("@sam when did sam join", "user_info", mention_count=1)
+        self.assertIntent("what's their timezone @sam", "user_info", mention_count=1)
+        self.assertIsNone(classify_intent_by_rules("when did sam join", mention_count=0))
+
+    def test_undecided_messages(self):
+        for message in ("I think the new map is better", "tell @sam about the event", "thanks for the map yesterday"):
+            self.assertIsNone(classify_intent_by_rules(message, message.count("@")), message)
+
+
+class ParseIntentLabelTest(unittest.TestCase):
+    def test_normalises_answers(self):
+        self.assertEqual(parse_intent_label(" `Server_Info`. "), "server_info")
+        self.assertIsNone(parse_intent_label("maybe general?"))
+        self.assertIsNone(parse_intent_label(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
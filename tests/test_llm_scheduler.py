@@ -0,0 +1,106 @@
+import asyncio
+import unittest
+from unittest import mock
+from src.components.utils import llmScheduler
+from src.components.utils.llmScheduler import (
+    LLMScheduler, TokenBucket, PRIORITY_BACKGROUND, PRIORITY_CLASSIFICATION, PRIORITY_INTERACTIVE
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_refills_at_rate_up_to_capacity(self):
+        clock = FakeClock()
+        with mock.patch.object(llmScheduler.time, "monotonic", clock.monotonic):
+            bucket = TokenBucket(rate=2.0, capacity=2)
+            self.assertEqual(bucket.try_acquire(), 0.0)
+            self.assertEqual(bucket.try_acquire(), 0.0)
+            self.assertAlmostEqual(bucket.try_acquire(), 0.5)
+
+            clock.now += 0.5
+            self.assertEqual(bucket.try_acquire(), 0.0)
+
+            clock.now += 100
+            bucket.try_acquire()
+            self.assertAlmostEqual(bucket.tokens, 1.0)  # capped at capacity, minus the token just taken
+
+    def test_refund_is_capped(self):
+        bucket = TokenBucket(rate=1.0, capacity=1)
+        bucket.refund()
+        self.assertLessEqual(bucket.tokens, 1.0)
+
+
+class SchedulerOrderTest(unittest.IsolatedAsyncioTestCase):
+    async def _run_order(self, jobs):
+        """Queues (label, priority, guild_id) jobs behind a blocker and returns their execution order"""
+        scheduler = LLMScheduler(max_concurrency=1, requests_per_minute=6000, burst=100)
+        release = asyncio.Event()
+        order = []
+
+        async def blocker():
+            await release.wait()
+
+        def record(label):
+            async def call():
+                order.append(label)
+            return call
+
+        blocking = asyncio.create_task(scheduler.submit(blocker))
+        await asyncio.sleep(0)
+        waiting = [asyncio.create_task(scheduler.submit(record(label), priority=priority, guild_id=guild_id))
+                   for label, priority, guild_id in jobs]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(blocking, *waiting)
+        return order
+
+    async def test_higher_priority_runs_first(self):
+        order = await self._run_order([
+            ("background", PRIORITY_BACKGROUND, 1),
+            ("classification", PRIORITY_CLASSIFICATION, 1),
+            ("interactive", PRIORITY_INTERACTIVE, 1),
+        ])
+        self.assertEqual(order, ["interactive", "classification", "background"])
+
+    async def test_guilds_are_served_round_robin(self):
+        order = await self._run_order([
+            ("a1", PRIORITY_INTERACTIVE, 1),
+            ("a2", PRIORITY_INTERACTIVE, 1),
+            ("a3", PRIORITY_INTERACTIVE, 1),
+            ("b1", PRIORITY_INTERACTIVE, 2),
+            ("c1", PRIORITY_INTERACTIVE, 3),
+        ])
+        self.assertEqual(order, ["a1", "b1", "c1", "a2", "a3"])
+
+    async def test_cancelled_job_never_runs(self):
+        scheduler = LLMScheduler(max_concurrency=1, requests_per_minute=6000, burst=100)
+        release = asyncio.Event()
+        ran = []
+
+        async def blocker():
+            await release.wait()
+
+        async def call():
+            ran.append(True)
+
+        blocking = asyncio.create_task(scheduler.submit(blocker))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(scheduler.submit(call))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        release.set()
+        await blocking
+        await asyncio.sleep(0.01)
+        self.assertEqual(ran, [])
+        self.assertEqual(scheduler.stats['completed'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
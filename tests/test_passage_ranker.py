@@ -0,0 +1,58 @@
+import unittest
+from src.components.utils.passageRanker import BM25Index, rank_passages
+
+
+class BM25IndexTest(unittest.TestCase):
+    def test_more_matching_terms_rank_higher(self):
+        index = BM25Index([
+            "tournament signups close friday",
+            "movie night tonight",
+            "tournament bracket and signups for the clan tournament",
+        ])
+        ranked = [doc_id for doc_id, _ in index.search("tournament signups")]
+        self.assertEqual(ranked, [2, 0])
+
+    def test_rare_terms_outweigh_common_ones(self):
+        index = BM25Index([
+            "game night game chat",
+            "game night schedule",
+            "minecraft server address",
+            "game updates",
+        ])
+        ranked = [doc_id for doc_id, _ in index.search("game minecraft")]
+        self.assertEqual(ranked[0], 2)
+
+    def test_shorter_documents_win_ties(self):
+        index = BM25Index(["verify role", "verify role plus a lot of unrelated chatter about other things"])
+        ranked = [doc_id for doc_id, _ in index.search("verify")]
+        self.assertEqual(ranked, [0, 1])
+
+    def test_stop_words_and_unknown_terms_match_nothing(self):
+        index = BM25Index(["how do i get the role"])
+        self.assertEqual(index.search("how do i"), [])
+        self.assertEqual(index.search("zzz"), [])
+
+
+class RankPassagesTest(unittest.TestCase):
+    MESSAGES = [
+        ("general", "a", "hello everyone"),
+        ("support", "b", "to verify, run /verify in the verify channel"),
+        ("events", "c", "tournament this weekend"),
+    ]
+
+    def test_best_match_first(self):
+        ranked = rank_passages("how do I verify", self.MESSAGES, top_k=2, token_budget=1000)
+        self.assertEqual(ranked[0], self.MESSAGES[1])
+        self.assertEqual(len(ranked), 1)
+
+    def test_falls_back_to_collection_order(self):
+        ranked = rank_passages("zzz", self.MESSAGES, top_k=2, token_budget=1000)
+        self.assertEqual(ranked, self.MESSAGES[:2])
+
+    def test_respects_top_k_and_budget(self):
+        self.assertEqual(rank_passages("zzz", self.MESSAGES, top_k=10, token_budget=0), [])
+        self.assertEqual(len(rank_passages("zzz", self.MESSAGES, top_k=1, token_budget=1000)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
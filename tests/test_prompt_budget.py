@@ -0,0 +1,64 @@
+import random
+import unittest
+from src.components.utils.promptBudget import (
+    PromptSection, TRUNCATION_MARKER, assemble_prompt, count_tokens, truncate_to_tokens
+)
+
+WORDS = ["alpha", "beta,", "gamma!", "delta", "epsilonverylongword", "zeta.", "eta\ntheta", "(iota)", "kappa?"]
+
+
+def random_text(rng: random.Random, max_words: int = 300) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, max_words)))
+
+
+class TruncateToTokensTest(unittest.TestCase):
+    def test_short_text_is_unchanged(self):
+        self.assertEqual(truncate_to_tokens("hello world", 50), "hello world")
+
+    def test_non_positive_budget_is_empty(self):
+        self.assertEqual(truncate_to_tokens("hello world", 0), "")
+
+    def test_truncated_text_ends_with_marker(self):
+        text = "\n".join(f"line number {i}" for i in range(50))
+        truncated = truncate_to_tokens(text, 20)
+        self.assertTrue(truncated.endswith(TRUNCATION_MARKER))
+        self.assertTrue(text.startswith(truncated[:-len(TRUNCATION_MARKER)]))
+
+    def test_never_exceeds_budget(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            text = random_text(rng)
+            for limit in (1, 2, 3, 5, 10, 40, 150):
+                with self.subTest(limit=limit):
+                    self.assertLessEqual(count_tokens(truncate_to_tokens(text, limit)), limit)
+
+
+class AssemblePromptTest(unittest.TestCase):
+    def test_fitting_sections_are_kept_in_order(self):
+        prompt = assemble_prompt([PromptSection("a", "first", 1), PromptSection("b", "second", 2)], token_limit=100)
+        self.assertEqual(prompt, "first\n\nsecond")
+
+    def test_least_important_section_is_dropped_first(self):
+        rng = random.Random(3)
+        sections = [
+            PromptSection("core", "core instructions", 0, required=True),
+            PromptSection("extra", random_text(rng, 400), 5),
+        ]
+        prompt = assemble_prompt(sections, token_limit=40)
+        self.assertTrue(prompt.startswith("core instructions"))
+        self.assertLessEqual(count_tokens(prompt), 40)
+
+    def test_never_exceeds_limit(self):
+        rng = random.Random(11)
+        for _ in range(100):
+            sections = [
+                PromptSection(f"s{i}", random_text(rng), rng.randint(0, 3), required=rng.random() < 0.5)
+                for i in range(rng.randint(1, 4))
+            ]
+            for limit in (100, 300, 1000):
+                with self.subTest(limit=limit):
+                    self.assertLessEqual(count_tokens(assemble_prompt(sections, token_limit=limit)), limit)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+from src.components.utils import resolverStats
+from src.components.utils.resolverStats import RollingSearchStats
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RollingSearchStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(resolverStats.time, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_percentiles_and_totals(self):
+        stats = RollingSearchStats(window_seconds=60)
+        for i in range(1, 101):
+            stats.record(1, latency=i / 100, messages_collected=0 if i % 10 == 0 else 5)
+        stats.record_error()
+        snapshot = stats.snapshot()
+
+        self.assertEqual(snapshot['totals'], {'searches': 100, 'empty_results': 10, 'errors': 1})
+        window = snapshot['window']
+        self.assertEqual(window['searches'], 100)
+        self.assertAlmostEqual(window['p50_latency'], 0.51)
+        self.assertAlmostEqual(window['p99_latency'], 1.0)
+        self.assertAlmostEqual(window['max_latency'], 1.0)
+        self.assertEqual(snapshot['guilds']['1']['lifetime_searches'], 100)
+
+    def test_expired_samples_leave_the_window(self):
+        stats = RollingSearchStats(window_seconds=60)
+        stats.record(1, latency=5.0, messages_collected=1)
+        self.clock.now += 30
+        stats.record(1, latency=1.0, messages_collected=1)
+        self.clock.now += 40
+        window = stats.snapshot()['window']
+        self.assertEqual(window['searches'], 1)
+        self.assertEqual(window['max_latency'], 1.0)
+
+    def test_idle_guilds_are_evicted(self):
+        stats = RollingSearchStats(window_seconds=60)
+        stats.record(1, latency=1.0, messages_collected=1)
+        self.clock.now += 50
+        stats.record(2, latency=1.0, messages_collected=1)
+        self.clock.now += 20
+        snapshot = stats.snapshot()
+        self.assertEqual(list(snapshot['guilds']), ['2'])
+        self.assertNotIn(1, stats._guilds)
+        self.assertEqual(snapshot['totals']['searches'], 2)
+
+    def test_guild_count_is_capped(self):
+        stats = RollingSearchStats(window_seconds=60, max_guilds=3)
+        for guild_id in (1, 2, 3):
+            stats.record(guild_id, latency=1.0, messages_collected=1)
+        stats.record(1, latency=1.0, messages_collected=1)  # guild 2 is now the least recently active
+        stats.record(4, latency=1.0, messages_collected=1)
+        self.assertEqual(sorted(stats.snapshot()['guilds']), ['1', '3', '4'])
+
+    def test_empty_window(self):
+        window = RollingSearchStats().snapshot()['window']
+        self.assertEqual(window['searches'], 0)
+        self.assertIsNone(window['p95_latency'])
+
+
+if __name__ == "__main__":
+    unittest.main()